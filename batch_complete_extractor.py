@@ -16,19 +16,22 @@ Usage:
 
 import os
 import sys
-import csv
-import asyncio
 import json
+import asyncio
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict
+from concurrent.futures import ThreadPoolExecutor
 
 from complete_email_extractor import complete_pipeline
+from concurrency import submit_bounded
+from record_source import iter_rows
+from result_sink import ResultSink, open_sink
 
 # ============== CONFIG ==============
 
 OUTPUT_CSV = "batch_complete_results.csv"
-OUTPUT_JSON = "batch_complete_results.json"
+OUTPUT_JSON = "batch_complete_results.jsonl"
 MAX_WORKERS = 2  # Number of parallel extractions
 TIMEOUT = 180  # seconds per extraction
 
@@ -89,63 +92,56 @@ def run_extraction(firm_name: str, person_name: str, address: str = "") -> Dict:
     result["runtime_sec"] = round(time.time() - start, 2)
     return result
 
-def load_input_csv(file_path: str) -> List[Dict]:
-    """Load input CSV file"""
+def load_input_csv(file_path: str) -> Iterator[Dict]:
+    """Stream rows from the input CSV (or .xlsx) file; exits right away if it is missing"""
+    # Checked here rather than in the generator, which would only run once
+    # the first row is pulled (after the output files are truncated)
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
         sys.exit(1)
+    return _iter_input_rows(file_path)
 
-    rows = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-
-        # Support both formats:
-        # 1. firm_name,address,person_name
-        # 2. firm_name,person_name (no address)
-
-        for row in reader:
-            # Clean field names
-            row = {k.strip(): v.strip() for k, v in row.items()}
-
-            firm = row.get('firm_name') or row.get('firm') or row.get('company') or ""
-            person = row.get('person_name') or row.get('person') or row.get('name') or ""
-            address = row.get('address') or row.get('location') or row.get('city') or ""
-
-            if not firm or not person:
-                log(f"⚠️ Skipping invalid row: {row}")
-                continue
-
-            rows.append({
-                "firm_name": firm,
-                "person_name": person,
-                "address": address
-            })
-
-    return rows
-
-def save_results(results: List[Dict]):
-    """Save results to CSV and JSON"""
+def _iter_input_rows(file_path: str) -> Iterator[Dict]:
+    # Support both formats:
+    # 1. firm_name,address,person_name
+    # 2. firm_name,person_name (no address)
 
-    # Save CSV
-    with open(OUTPUT_CSV, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
-        writer.writeheader()
-        writer.writerows(results)
+    for row in iter_rows(file_path):
+        # Clean field names
+        row = {str(k).strip(): str(v).strip() if v is not None else "" for k, v in row.items()}
 
-    log(f"📁 CSV saved to: {OUTPUT_CSV}")
+        firm = row.get('firm_name') or row.get('firm') or row.get('company') or ""
+        person = row.get('person_name') or row.get('person') or row.get('name') or ""
+        address = row.get('address') or row.get('location') or row.get('city') or ""
 
-    # Save JSON
-    with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+        if not firm or not person:
+            log(f"⚠️ Skipping invalid row: {row}")
+            continue
 
-    log(f"📁 JSON saved to: {OUTPUT_JSON}")
+        yield {
+            "firm_name": firm,
+            "person_name": person,
+            "address": address
+        }
 
-def print_summary(results: List[Dict]):
-    """Print summary statistics"""
-    total = len(results)
-    success = sum(1 for r in results if r['status'] == 'success')
-    failed = sum(1 for r in results if r['status'] == 'failed')
-    errors = sum(1 for r in results if r['status'] == 'error')
+def open_result_sinks() -> List[ResultSink]:
+    """CSV and JSONL outputs; each result is appended as soon as its case finishes"""
+    return [open_sink(OUTPUT_CSV, CSV_HEADERS), open_sink(OUTPUT_JSON)]
+
+def read_results(path: str) -> Iterator[Dict]:
+    """Results streamed back from the JSONL output"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def print_summary(path: str):
+    """Print summary statistics (two streaming passes over the JSONL output)"""
+    counts = Counter(r['status'] for r in read_results(path))
+    total = sum(counts.values())
+    success = counts['success']
+    failed = counts['failed']
+    errors = counts['error']
 
     print()
     print("=" * 70)
@@ -159,7 +155,7 @@ def print_summary(results: List[Dict]):
 
     if success > 0:
         print("\n✅ Successfully extracted emails:")
-        for r in results:
+        for r in read_results(path):
             if r['status'] == 'success':
                 contact_note = " [General Contact]" if r['is_general_contact'] else ""
                 print(f"   • {r['person_name']} @ {r['firm_name']}: {r['email']}{contact_note}")
@@ -184,44 +180,41 @@ def main():
 
     input_file = sys.argv[1]
 
-    # Load input
+    # Stream input
     rows = load_input_csv(input_file)
-    log(f"📋 Loaded {len(rows)} cases from {input_file}")
+    log(f"📋 Reading cases from {input_file}")
     print()
 
-    # Process with thread pool
-    results = []
+    # Process with thread pool (results go straight to the output files)
     print("=" * 70)
     log("🚀 Starting batch processing...")
     print("=" * 70)
     print()
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {
-            executor.submit(
-                run_extraction,
-                row['firm_name'],
-                row['person_name'],
-                row['address']
-            ): row for row in rows
-        }
-
-        for i, future in enumerate(as_completed(futures), start=1):
-            row = futures[future]
-            res = future.result()
-            results.append(res)
-
-            status_icon = "✅" if res['status'] == 'success' else "❌"
-            email_info = res['email'] or "None"
-
-            log(f"[{i}/{len(rows)}] {status_icon} {res['person_name']} @ {res['firm_name']} → {res['status']} ({email_info})")
-
-    # Save results
+    sinks = open_result_sinks()
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            extract = lambda row: run_extraction(row['firm_name'], row['person_name'], row['address'])
+            for i, (row, future) in enumerate(submit_bounded(executor, extract, rows, MAX_WORKERS * 2), start=1):
+                res = future.result()
+                for sink in sinks:
+                    sink.write(res)
+
+                status_icon = "✅" if res['status'] == 'success' else "❌"
+                email_info = res['email'] or "None"
+
+                log(f"[{i}] {status_icon} {res['person_name']} @ {res['firm_name']} → {res['status']} ({email_info})")
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    # Saved results
     print()
-    save_results(results)
+    log(f"📁 CSV saved to: {OUTPUT_CSV}")
+    log(f"📁 JSONL saved to: {OUTPUT_JSON}")
 
     # Print summary
-    print_summary(results)
+    print_summary(OUTPUT_JSON)
 
     print()
 
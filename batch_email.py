@@ -10,12 +10,14 @@ batch_email_final.py
 
 import os
 import sys
-import csv
 import re
 import time
 import subprocess
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+
+from concurrency import submit_bounded
+from result_sink import open_sink
 
 # ----------------------------------------------------------
 # 🔧 GLOBAL CONFIG
@@ -112,25 +114,23 @@ def run_case(url, person):
 
 # ----------------------------------------------------------
 def load_input_file(file_path):
-    """Read input file lines (url, person)."""
-    lines = [l.strip() for l in open(file_path, encoding="utf-8") if l.strip()]
-    pairs = []
-    for line in lines:
-        if "," not in line:
-            print(f"⚠️ Skipping invalid line: {line}")
-            continue
-        url, person = line.split(",", 1)
-        pairs.append((url.strip(), person.strip()))
-    return pairs
-
-# ----------------------------------------------------------
-def save_results(results):
-    """Save results to CSV."""
-    with open(OUTPUT_FILE, "w", newline='', encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=HEADERS)
-        writer.writeheader()
-        writer.writerows(results)
-    print(f"\n📁 Results saved to: {OUTPUT_FILE}")
+    """Stream input file lines (url, person)."""
+    # Opened here rather than in the generator, which would only run once
+    # the first pair is pulled (after the output CSV is truncated)
+    f = open(file_path, encoding="utf-8")
+    return _iter_pairs(f)
+
+def _iter_pairs(f):
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if "," not in line:
+                print(f"⚠️ Skipping invalid line: {line}")
+                continue
+            url, person = line.split(",", 1)
+            yield url.strip(), person.strip()
 
 # ----------------------------------------------------------
 def main():
@@ -140,21 +140,20 @@ def main():
 
     infile = sys.argv[1]
     pairs = load_input_file(infile)
-    print(f"🚀 Running batch for {len(pairs)} cases...\n")
+    print(f"🚀 Running batch for {infile}...\n")
 
-    results = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(run_case, url, person): (url, person) for url, person in pairs}
-        for i, future in enumerate(as_completed(futures), start=1):
+    # Results are appended to the CSV as each case finishes
+    with open_sink(OUTPUT_FILE, HEADERS) as sink, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        for i, (_, future) in enumerate(submit_bounded(executor, lambda pair: run_case(*pair), pairs, MAX_WORKERS * 2), start=1):
             res = future.result()
-            results.append(res)
+            sink.write(res)
             email = res['email_found'] or 'None'
-            print(f"[{i}/{len(pairs)}] ✅ {res['person']} @ {res['url']} → {res['status']} ({email})")
+            print(f"[{i}] ✅ {res['person']} @ {res['url']} → {res['status']} ({email})")
 
     print("\n==============================")
-    print(f"✅ Completed {len(results)} total tests.")
+    print(f"✅ Completed {sink.count} total tests.")
     print("==============================")
-    save_results(results)
+    print(f"\n📁 Results saved to: {OUTPUT_FILE}")
 
 # ----------------------------------------------------------
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared Browser Pool
+===================
+One Playwright driver and a few long-lived Chromium instances per process.
+
+- Callers get an isolated BrowserContext (own cookies/storage) instead of a
+  freshly launched browser, saving the launch cost on every agent run
+- Browsers are recycled after BROWSER_RECYCLE_PAGES pages, or when the
+  browser processes together exceed BROWSER_MAX_RSS_MB (needs psutil)
+- Never more than BROWSER_POOL_SIZE browsers run, retiring ones included;
+  callers wait for a slot while retired browsers drain
+- close() shuts down every browser and the Playwright driver; it also runs
+  at interpreter exit
+- Lives on the process-wide background loop: Playwright objects belong to
+  the loop that created them, so code using pooled contexts must run there
+  (see UniversalEmailAgent.run)
+
+Usage:
+    async with browser_pool.context(viewport={'width': 1920, 'height': 1080}) as ctx:
+        page = await ctx.new_page()
+"""
+
+import os
+import atexit
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from concurrency import in_background_loop, run_sync
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class BrowserPoolConfig:
+    MAX_BROWSERS: int = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    RECYCLE_PAGES: int = int(os.getenv("BROWSER_RECYCLE_PAGES", "200"))
+    MAX_RSS_MB: int = int(os.getenv("BROWSER_MAX_RSS_MB", "2048"))
+    HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "1") != "0"
+    LAUNCH_ARGS: List[str] = field(default_factory=lambda: [
+        '--disable-blink-features=AutomationControlled', '--no-sandbox', '--disable-dev-shm-usage',
+    ])
+
+CONFIG = BrowserPoolConfig()
+
+def browser_rss_mb() -> Optional[float]:
+    """Resident memory of all child processes (the browsers), None without psutil"""
+    if psutil is None:
+        return None
+    total = 0
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+    except psutil.Error:
+        return None
+    return total / (1024 * 1024)
+
+# ============== POOL ==============
+
+class _PooledBrowser:
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.active = 0
+        self.retiring = False
+
+    @property
+    def usable(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+class BrowserPool:
+    """Hands out contexts on a small set of shared Chromium instances"""
+
+    def __init__(self, config: BrowserPoolConfig = CONFIG):
+        self.config = config
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[_PooledBrowser] = []
+        self._owners: Dict[BrowserContext, _PooledBrowser] = {}
+        self._slots: Optional[asyncio.Condition] = None   # notified when a browser frees up or closes
+
+    def _check_loop(self):
+        if not in_background_loop():
+            raise RuntimeError("browser_pool must be used from the background loop (concurrency.await_in_background)")
+
+    async def _launch(self) -> _PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = await self._playwright.chromium.launch(
+            headless=self.config.HEADLESS, args=self.config.LAUNCH_ARGS
+        )
+        pooled = _PooledBrowser(browser)
+        self._browsers.append(pooled)
+        logger.debug(f"Browser pool: launched browser ({len(self._browsers)} running)")
+        return pooled
+
+    async def _retire_idle(self):
+        for pooled in list(self._browsers):
+            if (pooled.retiring or not pooled.browser.is_connected()) and pooled.active == 0:
+                self._browsers.remove(pooled)
+                try:
+                    await pooled.browser.close()
+                except Exception:
+                    pass
+                logger.debug(f"Browser pool: retired browser after {pooled.pages_served} pages")
+
+    def _check_recycle(self):
+        for pooled in self._browsers:
+            if pooled.pages_served >= self.config.RECYCLE_PAGES:
+                pooled.retiring = True
+        # While retired browsers are still draining, the memory they hold is
+        # already on its way out; checking again would retire their replacements too
+        if any(b.retiring for b in self._browsers):
+            return
+        rss = browser_rss_mb()
+        if rss is not None and rss > self.config.MAX_RSS_MB:
+            logger.info(f"Browser pool: browsers use {rss:.0f} MB, recycling")
+            for pooled in list(self._browsers):
+                pooled.retiring = True
+
+    def _condition(self) -> asyncio.Condition:
+        if self._slots is None:
+            self._slots = asyncio.Condition()
+        return self._slots
+
+    async def _pick(self) -> _PooledBrowser:
+        """Least busy usable browser (launching one if there is room); counts it as active"""
+        async with self._condition():
+            while True:
+                self._check_recycle()
+                await self._retire_idle()
+                usable = [b for b in self._browsers if b.usable]
+                if usable and (len(self._browsers) >= self.config.MAX_BROWSERS
+                               or min(b.active for b in usable) == 0):
+                    pooled = min(usable, key=lambda b: b.active)
+                elif len(self._browsers) < self.config.MAX_BROWSERS:
+                    pooled = await self._launch()
+                else:
+                    # every slot is taken by a retiring browser: wait until one closes
+                    await self._slots.wait()
+                    continue
+                pooled.active += 1
+                return pooled
+
+    async def _release(self, pooled: _PooledBrowser):
+        pooled.active -= 1
+        if pooled.retiring and pooled.active == 0:
+            async with self._condition():
+                await self._retire_idle()
+                self._slots.notify_all()
+
+    async def acquire_context(self, **context_options) -> BrowserContext:
+        """New isolated context on a pooled browser; give it back with release_context()"""
+        self._check_loop()
+        pooled = await self._pick()
+        try:
+            ctx = await pooled.browser.new_context(**context_options)
+        except Exception:
+            pooled.retiring = True
+            await self._release(pooled)
+            raise
+
+        def count_page(_page):
+            pooled.pages_served += 1
+
+        ctx.on("page", count_page)
+        self._owners[ctx] = pooled
+        return ctx
+
+    async def release_context(self, ctx: Optional[BrowserContext]):
+        if ctx is None:
+            return
+        pooled = self._owners.pop(ctx, None)
+        try:
+            await ctx.close()
+        except Exception:
+            pass
+        if pooled is not None:
+            await self._release(pooled)
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        ctx = await self.acquire_context(**context_options)
+        try:
+            yield ctx
+        finally:
+            await self.release_context(ctx)
+
+    async def close(self):
+        """Close every context, browser and the Playwright driver"""
+        for ctx in list(self._owners):
+            await self.release_context(ctx)
+        for pooled in self._browsers:
+            try:
+                await pooled.browser.close()
+            except Exception:
+                pass
+        self._browsers.clear()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+browser_pool = BrowserPool()
+
+@atexit.register
+def _close_browser_pool():
+    if browser_pool._playwright is not None:
+        try:
+            run_sync(browser_pool.close(), timeout=15)
+        except Exception:
+            pass
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Journal
+==================
+Append-only JSONL journal of finished records, so long spreadsheet runs can
+be interrupted at any point and resumed.
+
+- One line per finished record, flushed and fsync'd before the next write
+- A torn last line (crash mid-write) is ignored on load
+- Records are identified by record_id(): input row number + content hash,
+  so an edited row is processed again on resume
+
+Usage:
+    journal = CheckpointJournal(checkpoint_path(file_path, purpose))
+    done = journal.load()                    # {record_id: {"key": ..., "result": ...}}
+    offsets = journal.index()                # {record_id: offset}, entries via journal.read()
+    journal.append(rid, name_key, result)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict
+
+from disk_cache import make_key
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "checkpoints")
+
+def record_id(index: int, record: Dict[str, Any]) -> str:
+    """Stable ID for an input record: 1-based row number + hash of its fields"""
+    digest = make_key(record.get('Name', ''), record.get('Address', ''), record.get('Attorney Name', ''))
+    return f"{index}-{digest[:12]}"
+
+def checkpoint_path(input_file: str, purpose: str) -> str:
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(CHECKPOINT_DIR, f"{stem}.{purpose}.jsonl")
+
+# ============== JOURNAL ==============
+
+class CheckpointJournal:
+    """Append-only record journal"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Finished records from a previous run (later lines win)"""
+        done: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    done[entry['id']] = entry
+                except (ValueError, KeyError):
+                    logger.warning(f"Checkpoint: skipping unreadable line {line_no} in {self.path}")
+        return done
+
+    def index(self) -> Dict[str, int]:
+        """Byte offset of each finished record's line (later lines win), for read()"""
+        offsets: Dict[str, int] = {}
+        if not os.path.exists(self.path):
+            return offsets
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line_no, line in enumerate(f, 1):
+                try:
+                    if line.strip():
+                        offsets[json.loads(line)['id']] = offset
+                except (ValueError, KeyError):
+                    logger.warning(f"Checkpoint: skipping unreadable line {line_no} in {self.path}")
+                offset += len(line)
+        return offsets
+
+    def read(self, offset: int) -> Dict[str, Any]:
+        """Journal entry at an offset from index()"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def start_fresh(self):
+        """Move an existing journal aside so a new run starts empty"""
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            backup = f"{self.path}.{time.strftime('%Y%m%d_%H%M%S')}.bak"
+            os.replace(self.path, backup)
+            logger.info(f"Previous checkpoint moved to {backup}")
+
+    def append(self, rid: str, key: str, result: Dict[str, Any]):
+        line = json.dumps({'id': rid, 'key': key, 'result': result, 'ts': time.time()},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+                if self._file.tell() > 0 and not self._ends_with_newline():
+                    self._file.write("\n")  # terminate a line torn by a crash
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
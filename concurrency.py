@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Concurrency Controls
+====================
+Shared limits that let the pipeline process many records at once without
+hammering any single resource.
+
+- RecordScheduler: runs one coroutine per record, bounded; nothing is kept per
+  finished record, so workers write their own results out
+- stage_limit():   per-stage semaphores (search, llm, http, browser)
+- domain_limit():  caps concurrent work against a single website
+- configure():     override any limit before a run
+- run_sync() / await_in_background(): run coroutines on one process-wide
+  background loop, so clients that must be shared (LLM, browser) serve sync
+  callers, worker threads and every event loop alike
+- submit_bounded(): feed a thread pool from a (streaming) iterable without
+  submitting everything up front
+
+All limits default from environment variables and scale with CPU count.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+import concurrent.futures
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_CPUS = os.cpu_count() or 1
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class ConcurrencyConfig:
+    MAX_RECORDS: int = int(os.getenv("MAX_CONCURRENT_RECORDS", str(min(32, _CPUS * 4))))
+    PER_DOMAIN: int = int(os.getenv("MAX_CONCURRENT_PER_DOMAIN", "2"))
+    SEARCH: int = int(os.getenv("MAX_CONCURRENT_SEARCH", "2"))
+    LLM: int = int(os.getenv("MAX_CONCURRENT_LLM", "8"))
+    HTTP: int = int(os.getenv("MAX_CONCURRENT_HTTP", str(_CPUS * 16)))
+    # Counts agents, not pages: each email agent has its main page plus up to
+    # AGENT_PARALLEL_CANDIDATES candidate tabs open at once
+    BROWSER: int = int(os.getenv("MAX_CONCURRENT_BROWSER", str(max(2, _CPUS))))
+
+CONFIG = ConcurrencyConfig()
+
+STAGES = ("search", "llm", "http", "browser")
+
+def configure(**limits: int):
+    """
+    Override limits, e.g. configure(max_records=16, per_domain=1, llm=4).
+    Call before the event loop starts using the limits.
+    """
+    for name, value in limits.items():
+        attr = name.upper()
+        if not hasattr(CONFIG, attr):
+            raise ValueError(f"Unknown concurrency limit: {name}")
+        if value is not None:
+            setattr(CONFIG, attr, max(1, int(value)))
+
+# ============== PER-LOOP STATE ==============
+# asyncio primitives belong to the loop that first waits on them. The batch
+# runners start one loop per worker thread, so every shared primitive is kept
+# per loop.
+
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Any, Any]]" = weakref.WeakKeyDictionary()
+_loop_states_lock = threading.Lock()
+
+def loop_state() -> Dict[Any, Any]:
+    """Dict of shared objects owned by the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _loop_states_lock:
+        state = _loop_states.get(loop)
+        if state is None:
+            state = _loop_states[loop] = {}
+    return state
+
+def _semaphore(key: Any, size: int) -> asyncio.Semaphore:
+    state = loop_state()
+    sem = state.get(key)
+    if sem is None:
+        sem = state[key] = asyncio.Semaphore(size)
+    return sem
+
+# ============== LIMITS ==============
+
+def stage_limit(stage: str) -> asyncio.Semaphore:
+    """Semaphore bounding concurrent work of one stage: search, llm, http or browser"""
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage: {stage}")
+    return _semaphore(("stage", stage), getattr(CONFIG, stage.upper()))
+
+def domain_key(url: str) -> str:
+    host = urlparse(url).netloc.lower() if "//" in url else url.lower()
+    return host[4:] if host.startswith("www.") else host
+
+@asynccontextmanager
+async def domain_limit(url: str):
+    """Hold one of CONFIG.PER_DOMAIN slots for the website behind url"""
+    async with _semaphore(("domain", domain_key(url)), CONFIG.PER_DOMAIN):
+        yield
+
+# ============== BACKGROUND LOOP ==============
+
+_background: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running in a daemon thread (started on first use)"""
+    global _background
+    with _background_lock:
+        if _background is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="pipeline-io", daemon=True).start()
+            _background = loop
+    return _background
+
+def in_background_loop() -> bool:
+    try:
+        return asyncio.get_running_loop() is _background
+    except RuntimeError:
+        return False
+
+def run_in_background(coro: Awaitable[R]) -> "concurrent.futures.Future[R]":
+    return asyncio.run_coroutine_threadsafe(coro, background_loop())
+
+async def await_in_background(coro: Awaitable[R]) -> R:
+    """Await a coroutine on the background loop from any event loop"""
+    if in_background_loop():
+        return await coro
+    return await asyncio.wrap_future(run_in_background(coro))
+
+def run_sync(coro: Awaitable[R], timeout: Optional[float] = None) -> R:
+    """Run a coroutine on the background loop and block the calling thread for its result"""
+    if in_background_loop():
+        raise RuntimeError("run_sync() called from the background loop; await the coroutine instead")
+    return run_in_background(coro).result(timeout)
+
+# ============== RECORD SCHEDULER ==============
+
+class RecordScheduler:
+    """Runs a worker coroutine per record with bounded concurrency"""
+
+    def __init__(self, max_records: Optional[int] = None):
+        self.max_records = max(1, max_records or CONFIG.MAX_RECORDS)
+
+    async def run(self, records: Iterable[T], worker: Callable[[int, T], Awaitable[Any]]) -> int:
+        """
+        Call worker(index, record) for every record (index starts at 1).
+        Records are pulled lazily, so at most max_records are in flight, and
+        finished tasks are dropped right away: worker results are discarded,
+        so workers should write them out themselves. The first worker error
+        cancels the rest and is raised. Returns the number of records run.
+        """
+        slots = asyncio.Semaphore(self.max_records)
+        running: Set[asyncio.Task] = set()
+        failed: List[Exception] = []
+        count = 0
+
+        async def run_one(index: int, record: T):
+            try:
+                await worker(index, record)
+            except Exception as e:
+                failed.append(e)
+            finally:
+                slots.release()
+
+        try:
+            for index, record in enumerate(records, 1):
+                await slots.acquire()
+                if failed:
+                    break
+                task = asyncio.create_task(run_one(index, record))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                count = index
+            while running and not failed:
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            if failed:
+                raise failed[0]
+            return count
+        finally:
+            for task in list(running):
+                task.cancel()
+
+def submit_bounded(executor: concurrent.futures.Executor, fn: Callable[[T], R], items: Iterable[T],
+                   max_pending: int) -> Iterator[Tuple[T, "concurrent.futures.Future[R]"]]:
+    """
+    Submit fn(item) for every item, pulling items lazily so that at most
+    max_pending are queued or running. Yields (item, future) as they complete.
+    """
+    pending: Dict["concurrent.futures.Future[R]", T] = {}
+    items = iter(items)
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < max(1, max_pending):
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(fn, item)] = item
+        if not pending:
+            return
+        finished, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in finished:
+            yield pending.pop(future), future
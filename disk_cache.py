@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Persistent Disk Cache
+=====================
+Small key/value store on SQLite used by the pipeline's caches.
+
+- Content-addressed keys (make_key hashes any JSON-serialisable parts)
+- Per-entry TTL, expired rows are ignored and purged
+- Size-based eviction (least recently used first) once max_bytes is exceeded
+- WAL journal + one connection per thread, so worker threads and processes
+  can read and write concurrently without half-written entries
+- Hit/miss counters (stats())
+
+Usage:
+    cache = DiskCache(cache_path("llm_cache.sqlite3"), ttl=86400)
+    key = make_key(model, prompt)
+    value = cache.get(key)
+    cache.set(key, value)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", "cache")
+
+def cache_path(filename: str) -> str:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+def make_key(*parts: Any) -> str:
+    """Stable SHA-256 over the JSON encoding of parts"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+# ============== DISK CACHE ==============
+
+class DiskCache:
+    """JSON values in a single SQLite file with TTL and size-based eviction"""
+
+    EVICT_EVERY = 100  # writes between size checks
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key      TEXT PRIMARY KEY,
+                value    TEXT NOT NULL,
+                size     INTEGER NOT NULL,
+                created  REAL NOT NULL,
+                expires  REAL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+            CREATE INDEX IF NOT EXISTS entries_expires ON entries(expires);
+        """)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires = row
+            if expires is not None and expires < now:
+                self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            self._conn().execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(value)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Cache read failed ({os.path.basename(self.path)}): {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        data = json.dumps(value, ensure_ascii=False)
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, expires, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now + ttl if ttl else None, now),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache write failed ({os.path.basename(self.path)}): {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def delete(self, key: str):
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """(key, value) for every unexpired entry"""
+        rows = self._conn().execute(
+            "SELECT key, value FROM entries WHERE expires IS NULL OR expires >= ?", (time.time(),)
+        ).fetchall()
+        for key, value in rows:
+            try:
+                yield key, json.loads(value)
+            except ValueError:
+                continue
+
+    def evict(self):
+        """Drop expired rows, then least recently used rows until under max_bytes"""
+        conn = self._conn()
+        try:
+            conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (time.time(),))
+            if not self.max_bytes:
+                return
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - self.max_bytes
+            freed = 0
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+                doomed.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+            logger.debug(f"Cache evicted {len(doomed)} entries from {os.path.basename(self.path)}")
+        except sqlite3.Error as e:
+            logger.warning(f"Cache eviction failed ({os.path.basename(self.path)}): {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "entries": len(self),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
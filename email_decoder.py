@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Email Obfuscation Decoder
+=========================
+Turn obfuscated addresses in page text/HTML back into plain emails, in one
+pass of a single precompiled pattern.
+
+- HTML entities (&#64; &#x40; &commat; &period; ...)
+- [at] (at) {at} <at> and [dot] (dot) {dot} <dot> variants, any case
+- Cloudflare email protection (data-cfemail="..." and
+  /cdn-cgi/l/email-protection#...)
+- Reversed text shown with CSS (direction: rtl / unicode-bidi: bidi-override)
+- loose=True also reads bare " at " / " dot " as @ / . (for contact pages,
+  where this is common; noisy on arbitrary prose). Loose mode uses its own
+  compiled pattern, so it is still a single pass
+
+Usage:
+    emails = find_emails(html)              # lowercased, unique, in page order
+    plain = decode_obfuscation(text)
+"""
+
+import re
+import html
+from typing import Iterable, List
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+_BRACKETED = r"\s*[\[\(\{<]\s*{word}\s*[\]\)\}>]\s*"
+
+def _compile(loose: bool) -> "re.Pattern":
+    at = [_BRACKETED.replace("{word}", "at"), r"\s*&(?:#0*64|#[xX]0*40|commat);\s*"]
+    dot = [_BRACKETED.replace("{word}", "dot"), r"&(?:#0*46|#[xX]0*2[eE]|period);"]
+    if loose:
+        # bare words only in lowercase, otherwise every "At" in prose would match
+        at.append(r"(?-i:\s+at\s+)")
+        dot.append(r"(?-i:\s+dot\s+)")
+    return re.compile(
+        "|".join([
+            r"(?P<cfattr>data-cfemail=[\"'](?P<cfattr_hex>[0-9a-fA-F]+)[\"'])",
+            r"(?P<cfhref>/cdn-cgi/l/email-protection#(?P<cfhref_hex>[0-9a-fA-F]+))",
+            r"(?P<rtl><(?P<tag>[a-zA-Z][\w-]*)[^>]*?(?:direction\s*:\s*rtl|bidi-override)[^>]*>"
+            r"(?P<rtl_text>[^<]*)</(?P=tag)\s*>)",
+            r"(?P<at>" + "|".join(at) + ")",
+            r"(?P<dot>" + "|".join(dot) + ")",
+            r"(?P<entity>&(?:#\d{1,6}|#[xX][0-9a-fA-F]{1,6});)",
+        ]),
+        re.IGNORECASE,
+    )
+
+_OBFUSCATION_RE = _compile(loose=False)
+_LOOSE_OBFUSCATION_RE = _compile(loose=True)
+
+def decode_cfemail(hex_string: str) -> str:
+    """Decode a Cloudflare-protected email (first byte is the XOR key)"""
+    try:
+        data = bytes.fromhex(hex_string)
+    except ValueError:
+        return ""
+    if len(data) < 2:
+        return ""
+    key = data[0]
+    return bytes(b ^ key for b in data[1:]).decode("utf-8", errors="ignore")
+
+def _replace(m: "re.Match") -> str:
+    if m.group("cfattr"):
+        return f' {decode_cfemail(m.group("cfattr_hex"))} '
+    if m.group("cfhref"):
+        return f' {decode_cfemail(m.group("cfhref_hex"))} '
+    if m.group("rtl"):
+        return f' {m.group("rtl_text")[::-1]} '
+    if m.group("at"):
+        return "@"
+    if m.group("dot"):
+        return "."
+    return html.unescape(m.group("entity"))
+
+def decode_obfuscation(text: str, loose: bool = False) -> str:
+    """Text with every known email obfuscation decoded"""
+    if not text:
+        return ""
+    return (_LOOSE_OBFUSCATION_RE if loose else _OBFUSCATION_RE).sub(_replace, text)
+
+def find_emails(text: str, loose: bool = False) -> List[str]:
+    """Unique lowercased emails in text/HTML, in order of appearance"""
+    found = (e.lower() for e in EMAIL_RE.findall(decode_obfuscation(text, loose)))
+    return list(dict.fromkeys(found))
+
+def find_emails_in(texts: Iterable[str], loose: bool = False) -> List[str]:
+    """find_emails() over several texts, de-duplicated across all of them"""
+    found: List[str] = []
+    for text in texts:
+        found.extend(find_emails(text, loose))
+    return list(dict.fromkeys(found))
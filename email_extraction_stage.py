@@ -21,12 +21,14 @@ Behavior:
 Note: Run responsibly. Respect robots.txt & site rate limits when using at scale.
 """
 
-import os, re, sys, json, time, requests, difflib
+import os, re, sys, json, requests, difflib
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
-from groq import Groq
+
+from llm_client import llm_client
+from page_renderer import page_renderer
+from email_decoder import find_emails_in
+from html_parsing import parse_html
 
 # -------------- config --------------
 load_dotenv()
@@ -36,45 +38,19 @@ if not GROQ_KEY:
     sys.exit(1)
 
 MODEL = "llama-3.1-8b-instant"
-client = Groq(api_key=GROQ_KEY)
 
 UA = "SmartEmailFinder/1.0 (+https://github.com/)"
 REQUEST_TIMEOUT = 15
-MAX_SITE_PAGES = 25           # how many internal pages to fetch in failover
+MAX_SITE_PAGES = 25           # how many internal pages to fetch in failover (rendered in parallel tabs)
 PLAYWRIGHT_SCROLL_TRIES = 12  # when scrolling dynamic directories
 # ------------------------------------
 
 # ---------- utility functions ----------
-def render_page_html_and_links(url, headless=True, scroll=False, scroll_tries=5):
-    """Render page with Playwright, return HTML and absolute links."""
+def render_page_html_and_links(url, scroll=False, scroll_tries=5):
+    """Render page with the shared Playwright pool, return HTML and absolute links.
+    Headless mode is a pool setting (BROWSER_HEADLESS), not a per-call one."""
     print(f"🌐 Render: {url}")
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        page = browser.new_page(user_agent=UA)
-        page.goto(url, wait_until="networkidle", timeout=45000)
-        
-        if scroll:
-            last_h = 0
-            for _ in range(scroll_tries):
-                page.mouse.wheel(0, 3000)
-                page.wait_for_timeout(800)
-                new_h = page.evaluate("document.body.scrollHeight")
-                if new_h == last_h:
-                    break
-                last_h = new_h
-        html = page.content()
-        # gather links
-        els = page.query_selector_all("a[href]")
-        links = []
-        for a in els:
-            try:
-                href = a.get_attribute("href")
-                if href:
-                    links.append(urljoin(url, href.split("#")[0]))
-            except Exception:
-                continue
-        browser.close()
-    return html, list(dict.fromkeys(links))  # preserve unique order
+    return page_renderer.render_sync(url, scroll=scroll, scroll_tries=scroll_tries, user_agent=UA)
 
 def simple_fetch_html_links(url):
     """Fast HTTP GET + parse links (fallback)"""
@@ -82,20 +58,13 @@ def simple_fetch_html_links(url):
         r = requests.get(url, headers={"User-Agent": UA}, timeout=REQUEST_TIMEOUT)
         if r.status_code != 200:
             return "", []
-        soup = BeautifulSoup(r.text, "html.parser")
-        links = []
-        for a in soup.select("a[href]"):
-            href = a.get("href")
-            if href:
-                links.append(urljoin(url, href.split("#")[0]))
-        return r.text, list(dict.fromkeys(links))
+        return r.text, parse_html(r.text).urls(url)
     except Exception:
         return "", []
 
-def extract_emails_from_text(text):
-    """Return list of unique emails found via regex."""
-    emails = re.findall(r"[\w\.-]+@[\w\.-]+\.\w+", text)
-    return list(dict.fromkeys([e.lower() for e in emails]))
+def extract_emails_from_text(text, html=None):
+    """Return list of unique emails (obfuscations decoded), from text and optionally raw HTML."""
+    return find_emails_in([text, html or ""])
 
 def domain_only(url):
     try:
@@ -148,13 +117,7 @@ Here are the pages (url + snippet). Keep JSON machine-parseable only.
 Pages:
 {json.dumps(sample_data, ensure_ascii=False)[:38000]}
 """
-    resp = client.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.0,
-        max_tokens=800,
-    )
-    raw = resp.choices[0].message.content.strip()
+    raw = llm_client.complete_sync(prompt, model=MODEL, temperature=0.0, max_tokens=800)
     # extract JSON object from raw
     try:
         jtext = re.search(r"\{.*\}", raw, re.S).group(0)
@@ -182,7 +145,7 @@ def sitewide_failover_search(home_url, person_name, max_pages=MAX_SITE_PAGES):
     print("🔎 Failover: sitewide search starting from homepage...")
 
     # 1) render home quickly, collect candidate links
-    html, links = render_page_html_and_links(home_url, headless=True, scroll=False)
+    html, links = render_page_html_and_links(home_url, scroll=False)
     internal_links = [l for l in links if urlparse(l).netloc == urlparse(home_url).netloc]
     # keep order, limit
     candidate_links = internal_links[: max_pages]
@@ -190,30 +153,27 @@ def sitewide_failover_search(home_url, person_name, max_pages=MAX_SITE_PAGES):
     if home_url not in candidate_links:
         candidate_links.insert(0, home_url)
 
+    candidate_links = list(dict.fromkeys(candidate_links))
+
+    # 2) render all candidates in parallel tabs and extract text
+    # for directories/likely dynamic pages, scroll briefly
+    rendered = page_renderer.render_many_sync(
+        candidate_links,
+        scroll=lambda u: any(k in u.lower() for k in ("/people", "/professionals", "/team", "/about")),
+        scroll_tries=4,
+        user_agent=UA,
+    )
     pages = []
-    seen = set()
-    # 2) render each candidate and extract text
-    for url in candidate_links:
-        if url in seen:
-            continue
-        seen.add(url)
-        try:
-            # for directories/likely dynamic pages, scroll briefly
-            scroll = any(k in url.lower() for k in ("/people", "/professionals", "/team", "/about"))
-            html, _ = render_page_html_and_links(url, headless=True, scroll=scroll, scroll_tries=4)
-            # extract visible text
-            soup = BeautifulSoup(html, "html.parser")
-            for s in soup(["script","style","noscript","svg"]):
-                s.decompose()
-            text = soup.get_text(" ", strip=True)
-            snippet = text[:5000]
-            pages.append({"url": url, "text": snippet})
-        except Exception as e:
+    for url, page in zip(candidate_links, rendered):
+        if page is None:
             # fallback fetch
             t, _ = simple_fetch_html_links(url)
             pages.append({"url": url, "text": (t or "")[:5000]})
-        # polite delay
-        time.sleep(0.6)
+            continue
+        html, _ = page
+        # extract visible text
+        snippet = parse_html(html).text[:5000]
+        pages.append({"url": url, "text": snippet})
 
     # 3) quick regex pass across page texts
     found_emails = {}
@@ -270,7 +230,7 @@ def sitewide_failover_search(home_url, person_name, max_pages=MAX_SITE_PAGES):
 
 # Minimal re-implementations / lightweight copy of detection + selection (keeps script self-contained)
 def render_page(url):
-    html, links = render_page_html_and_links(url, headless=True, scroll=False, scroll_tries=3)
+    html, links = render_page_html_and_links(url, scroll=False, scroll_tries=3)
     return html, links
 
 def detect_structure_quick(url):
@@ -302,8 +262,7 @@ Candidates:
 {candidates[:60]}
 """
     try:
-        r = client.chat.completions.create(model=MODEL, messages=[{"role":"user","content":prompt}], temperature=0.0)
-        raw = r.choices[0].message.content
+        raw = llm_client.complete_sync(prompt, model=MODEL, temperature=0.0, max_tokens=None)
         data = json.loads(re.search(r"\{.*\}", raw, re.S).group(0))
         return data.get("directory")
     except:
@@ -318,8 +277,7 @@ URLs:
 {urls[:150]}
 """
     try:
-        r = client.chat.completions.create(model=MODEL, messages=[{"role":"user","content":prompt}], temperature=0.0)
-        raw = r.choices[0].message.content
+        raw = llm_client.complete_sync(prompt, model=MODEL, temperature=0.0, max_tokens=None)
         data = json.loads(re.search(r"\{.*\}", raw, re.S).group(0))
         url = data.get("profile_url", "none")
     except:
@@ -343,8 +301,7 @@ Given these emails {emails} and this page text snippet, which email belongs to {
 TEXT:
 {text[:2000]}
 """
-    r = client.chat.completions.create(model=MODEL, messages=[{"role":"user","content":prompt}], temperature=0.0)
-    return r.choices[0].message.content.strip()
+    return llm_client.complete_sync(prompt, model=MODEL, temperature=0.0, max_tokens=None)
 
 # ---------- main ----------
 def main():
@@ -405,8 +362,8 @@ def main():
     if chosen and chosen != "none":
         print(f"➡️ Chosen profile: {chosen}")
         # render and extract
-        html, _ = render_page_html_and_links(chosen, headless=True, scroll=True, scroll_tries=4)
-        emails = extract_emails_from_text(BeautifulSoup(html,'html.parser').get_text(" ",strip=True))
+        html, _ = render_page_html_and_links(chosen, scroll=True, scroll_tries=4)
+        emails = extract_emails_from_text(parse_html(html).text, html)
         if emails:
             # let LLM pick
             final = ai_choose_email_quick(person_name, emails, html)
@@ -436,19 +393,7 @@ def print_results(results, name):
 def fetch_graphql_profiles(directory_url):
     # Playwright scroll method (kept minimal)
     print("⚙️ Scroll-fetch (Playwright) for dynamic lists...")
-    with sync_playwright() as p:
-        browser=p.chromium.launch(headless=True)
-        page=browser.new_page(user_agent=UA)
-        page.goto(directory_url, wait_until="networkidle", timeout=45000)
-        last_h=0
-        for _ in range(PLAYWRIGHT_SCROLL_TRIES):
-            page.mouse.wheel(0,3000)
-            page.wait_for_timeout(800)
-            new_h=page.evaluate("document.body.scrollHeight")
-            if new_h==last_h: break
-            last_h=new_h
-        links=[urljoin(directory_url,a.get_attribute("href")) for a in page.query_selector_all("a[href]")]
-        browser.close()
+    _, links = page_renderer.render_sync(directory_url, scroll=True, scroll_tries=PLAYWRIGHT_SCROLL_TRIES, user_agent=UA)
     profiles=[u for u in links if any(k in u.lower() for k in ("people","professional","team","attorney","person"))]
     return list(dict.fromkeys(profiles))
 
@@ -470,26 +415,13 @@ def fetch_html_profiles(directory_url):
     # first try fast GET
     try:
         r = requests.get(directory_url, headers={"User-Agent":UA}, timeout=REQUEST_TIMEOUT)
-        soup=BeautifulSoup(r.text,'html.parser')
-        links=[urljoin(directory_url,a['href']) for a in soup.select("a[href]")]
+        links=parse_html(r.text).urls(directory_url)
         profiles=[u for u in links if any(k in u.lower() for k in ("people","professional","team","attorney","bio"))]
         if len(profiles)>150:
             return list(dict.fromkeys(profiles))
     except: profiles=[]
     # fallback to Playwright scroll + collect links
-    with sync_playwright() as p:
-        browser=p.chromium.launch(headless=True)
-        page=browser.new_page(user_agent=UA)
-        page.goto(directory_url, wait_until="networkidle", timeout=45000)
-        last_h=0
-        for _ in range(PLAYWRIGHT_SCROLL_TRIES):
-            page.mouse.wheel(0,3000)
-            page.wait_for_timeout(800)
-            new_h=page.evaluate("document.body.scrollHeight")
-            if new_h==last_h: break
-            last_h=new_h
-        links=[urljoin(directory_url,a.get_attribute("href")) for a in page.query_selector_all("a[href]")]
-        browser.close()
+    _, links = page_renderer.render_sync(directory_url, scroll=True, scroll_tries=PLAYWRIGHT_SCROLL_TRIES, user_agent=UA)
     profiles=[u for u in links if any(k in u.lower() for k in ("people","professional","team","attorney","bio"))]
     return list(dict.fromkeys(profiles))
 
@@ -549,10 +481,9 @@ def find_email_from_site(home_url: str, person_name: str):
     chosen = ai_pick_profile_quick(person_name, profile_urls)
     if chosen and chosen != "none":
         print(f"➡️ Chosen profile: {chosen}")
-        html, _ = render_page_html_and_links(chosen, headless=True, scroll=True, scroll_tries=4)
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(" ", strip=True)
-        emails = extract_emails_from_text(text)
+        html, _ = render_page_html_and_links(chosen, scroll=True, scroll_tries=4)
+        text = parse_html(html).text
+        emails = extract_emails_from_text(text, html)
         if emails:
             final = ai_choose_email_quick(person_name, emails, text)
             print(f"✅ Integrated result: {final}")
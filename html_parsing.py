@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Shared HTML Parsing
+===================
+One fast parse per page for everything the pipeline reads from HTML:
+visible text and links (with anchor text).
+
+- Backends: selectolax (if installed) > lxml > stdlib html.parser
+- Text and links are collected in a single walk of the tree
+- script/style/noscript/svg/template content is never part of the text
+- Parses are memoised (PARSE_CACHE_SIZE pages), so the same HTML handled
+  by several steps of a record is only parsed once
+- VisibleTextReader: incremental text extraction for streamed downloads,
+  done as soon as enough text has been seen
+
+Usage:
+    page = parse_html(html)
+    page.text                          # visible text, whitespace collapsed
+    for link in page.links(base_url):  # Link(url, href, text)
+        ...
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import List, NamedTuple, Tuple
+from urllib.parse import urljoin
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "32"))
+
+SKIP_TAGS = frozenset({"script", "style", "noscript", "svg", "template"})
+
+class Link(NamedTuple):
+    url: str    # absolute, fragment removed
+    href: str   # as written in the page
+    text: str   # anchor text, whitespace collapsed
+
+@dataclass(frozen=True)
+class ParsedPage:
+    text: str
+    anchors: Tuple[Tuple[str, str], ...]   # (href, anchor text) in page order
+
+    def links(self, base_url: str = "") -> List[Link]:
+        """Links with a non-empty href, resolved against base_url"""
+        result = []
+        for href, text in self.anchors:
+            if not href:
+                continue
+            url = href.split("#")[0]
+            result.append(Link(urljoin(base_url, url) if base_url else url, href, text))
+        return result
+
+    def urls(self, base_url: str = "") -> List[str]:
+        """Unique absolute link URLs in page order"""
+        return list(dict.fromkeys(link.url for link in self.links(base_url)))
+
+def _collapse(parts: List[str], sep: str = " ") -> str:
+    return " ".join(sep.join(parts).split())
+
+# ============== BACKENDS ==============
+
+def _parse_selectolax(html: str) -> ParsedPage:
+    tree = SelectolaxParser(html)
+    anchors = tuple(
+        ((node.attributes.get("href") or "").strip(), " ".join(node.text(separator=" ").split()))
+        for node in tree.css("a[href]")
+    )
+    tree.strip_tags(list(SKIP_TAGS))
+    root = tree.body or tree.root
+    text = " ".join(root.text(separator=" ").split()) if root is not None else ""
+    return ParsedPage(text, anchors)
+
+def _parse_lxml(html: str) -> ParsedPage:
+    try:
+        root = lxml.html.document_fromstring(html)
+    except ValueError:
+        # str input with an XML encoding declaration
+        root = lxml.html.document_fromstring(html.encode("utf-8"))
+
+    parts: List[str] = []
+    anchors: List[Tuple[str, str]] = []
+    open_anchors: List[Tuple[str, List[str]]] = []
+    skip = 0
+
+    def add(s: str):
+        parts.append(s)
+        for _, anchor_parts in open_anchors:
+            anchor_parts.append(s)
+
+    # Explicit walk rather than iterwalk(), which gives no end event for
+    # comments / processing instructions, so text after them was lost
+    stack: List[Tuple[object, bool]] = [(root, False)]
+    while stack:
+        el, closing = stack.pop()
+        tag = el.tag if isinstance(el.tag, str) else None   # None: comment / PI
+        if tag is None:
+            if not skip and el.tail:
+                add(el.tail)
+            continue
+        if not closing:
+            if tag in SKIP_TAGS:
+                skip += 1
+            elif not skip:
+                if tag == "a":
+                    open_anchors.append(((el.get("href") or "").strip(), []))
+                if el.text:
+                    add(el.text)
+            stack.append((el, True))
+            stack.extend((child, False) for child in reversed(el))
+            continue
+
+        if tag in SKIP_TAGS:
+            skip -= 1
+        elif not skip and tag == "a" and open_anchors:
+            href, anchor_parts = open_anchors.pop()
+            if href:
+                anchors.append((href, _collapse(anchor_parts)))
+        if not skip and el.tail and el is not root:
+            add(el.tail)
+
+    return ParsedPage(_collapse(parts), tuple(anchors))
+
+class _Walker(HTMLParser):
+    """Single-pass text + link collector for the stdlib fallback"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.anchors: List[Tuple[str, str]] = []
+        self.open_anchors: List[Tuple[str, List[str]]] = []
+        self.skip = 0
+        self.size = 0   # characters of (stripped) text seen so far
+
+    # Text may arrive split at feed() boundaries, so parts are joined without
+    # a separator and every tag boundary adds one instead
+
+    def handle_starttag(self, tag, attrs):
+        self._boundary()
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        elif tag == "a" and not self.skip:
+            self.open_anchors.append(((dict(attrs).get("href") or "").strip(), []))
+
+    def handle_endtag(self, tag):
+        self._boundary()
+        if tag in SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag == "a" and self.open_anchors:
+            href, anchor_parts = self.open_anchors.pop()
+            if href:
+                self.anchors.append((href, _collapse(anchor_parts, "")))
+
+    def _boundary(self):
+        if not self.skip:
+            self.parts.append(" ")
+            for _, anchor_parts in self.open_anchors:
+                anchor_parts.append(" ")
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.parts.append(data)
+            self.size += len(data.strip())
+            for _, anchor_parts in self.open_anchors:
+                anchor_parts.append(data)
+
+def _parse_stdlib(html: str) -> ParsedPage:
+    walker = _Walker()
+    walker.feed(html)
+    walker.close()
+    # unclosed <a> at end of document
+    for href, anchor_parts in reversed(walker.open_anchors):
+        if href:
+            walker.anchors.append((href, _collapse(anchor_parts, "")))
+    return ParsedPage(_collapse(walker.parts, ""), tuple(walker.anchors))
+
+class VisibleTextReader:
+    """Feed HTML in chunks; feed() returns True once `limit` characters of text are in"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._walker = _Walker()
+
+    @property
+    def done(self) -> bool:
+        return self._walker.size >= self.limit
+
+    def feed(self, chunk: str) -> bool:
+        self._walker.feed(chunk)
+        return self.done
+
+    def result(self) -> str:
+        return _collapse(self._walker.parts, "")[:self.limit]
+
+if SelectolaxParser is not None:
+    _backend = _parse_selectolax
+elif lxml is not None:
+    _backend = _parse_lxml
+else:
+    _backend = _parse_stdlib
+
+# ============== PUBLIC API ==============
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_html(html: str) -> ParsedPage:
+    """Visible text and links of an HTML document (memoised)"""
+    if not html:
+        return ParsedPage("", ())
+    try:
+        return _backend(html)
+    except Exception as e:
+        if _backend is _parse_stdlib:
+            raise
+        logger.debug(f"Fast parser failed ({str(e)[:60]}), using html.parser")
+        return _parse_stdlib(html)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Shared Async HTTP Fetcher
+=========================
+One pooled httpx.AsyncClient for plain page fetches.
+
+- Keep-alive connection pool, HTTP/2 when the h2 package is installed
+- Per-host connection limit on top of the "http" stage limit
+- Connect/read/write/pool timeouts plus a total deadline per request
+- probe(): request many candidate URLs at once and return the first
+  acceptable one in priority order, so guessing a site's common paths
+  costs one round-trip instead of the sum of every timeout
+- get_capped() / get_capped_many_sync(): streaming download that skips
+  non-text content types, stops after a byte budget and can hand chunks to
+  an incremental reader that ends the download once it has enough; the
+  _many variant requests many URLs at once under one deadline, whatever
+  has not answered by then is cancelled and left out
+- Lives on the process-wide background loop, like llm_client
+
+Usage:
+    response = await http_fetcher.get(url)                      # None on failure
+    url, response = await http_fetcher.probe(urls, accept=lambda r: r.status_code == 200)
+    pages = http_fetcher.get_capped_many_sync(urls, reader=lambda: VisibleTextReader(2000))
+"""
+
+import os
+import codecs
+import asyncio
+import atexit
+import logging
+import importlib.util
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, NamedTuple, Optional, Protocol, Sequence, Tuple
+
+import httpx
+
+from concurrency import await_in_background, run_sync, stage_limit, domain_key
+
+logger = logging.getLogger(__name__)
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class FetchConfig:
+    CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    TOTAL_TIMEOUT: float = float(os.getenv("HTTP_TOTAL_TIMEOUT", "15"))
+    MAX_CONNECTIONS: int = 100
+    MAX_KEEPALIVE: int = 20
+    PER_HOST: int = int(os.getenv("HTTP_MAX_PER_HOST", "6"))
+    HTTP2: bool = os.getenv("HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+    USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    MAX_BYTES: int = int(os.getenv("HTTP_MAX_BYTES", str(512 * 1024)))   # budget for capped downloads
+
+CONFIG = FetchConfig()
+
+Accept = Callable[[httpx.Response], bool]
+
+def ok(response: httpx.Response) -> bool:
+    return response.status_code == 200
+
+TEXT_TYPES = ("html", "xml", "text/plain")
+
+class TextReader(Protocol):
+    def feed(self, chunk: str) -> bool: ...   # True = seen enough, stop downloading
+    def result(self) -> str: ...
+
+# Everything a single bad URL can raise; caught per URL so one of them never
+# fails a whole batch (InvalidURL and StreamError are not HTTPErrors)
+FETCH_ERRORS = (httpx.HTTPError, httpx.InvalidURL, httpx.StreamError, asyncio.TimeoutError, ValueError)
+
+class CappedPage(NamedTuple):
+    url: str
+    status_code: int
+    content_type: str
+    text: str          # decoded body prefix, or the reader's result
+    truncated: bool    # stopped before the end of the body
+
+# ============== FETCHER ==============
+
+@dataclass
+class _HostSlot:
+    semaphore: asyncio.Semaphore
+    users: int = 0      # holding or waiting for the semaphore
+
+class HttpFetcher:
+    """Async page fetcher bound to the background loop"""
+
+    def __init__(self, config: FetchConfig = CONFIG):
+        self.config = config
+        self._http: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, _HostSlot] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                http2=self.config.HTTP2,
+                follow_redirects=True,
+                headers={"User-Agent": self.config.USER_AGENT},
+                timeout=httpx.Timeout(
+                    connect=self.config.CONNECT_TIMEOUT,
+                    read=self.config.READ_TIMEOUT,
+                    write=self.config.READ_TIMEOUT,
+                    pool=self.config.TOTAL_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.config.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.MAX_KEEPALIVE,
+                ),
+            )
+        return self._http
+
+    @asynccontextmanager
+    async def _host_limit(self, url: str):
+        """Hold one of PER_HOST slots for url's host; idle hosts are forgotten"""
+        host = domain_key(url)
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = _HostSlot(asyncio.Semaphore(self.config.PER_HOST))
+        slot.users += 1
+        try:
+            async with slot.semaphore:
+                yield
+        finally:
+            slot.users -= 1
+            if not slot.users and self._hosts.get(host) is slot:
+                del self._hosts[host]
+
+    async def _get(self, url: str, timeout: Optional[float], headers: Optional[Dict[str, str]],
+                   follow_redirects: bool) -> Optional[httpx.Response]:
+        """Runs on the background loop"""
+        try:
+            # Per-host slot first: requests queued behind a busy host must not
+            # sit on global slots that other hosts could use
+            async with self._host_limit(url), stage_limit("http"):
+                return await asyncio.wait_for(
+                    self._client().get(url, headers=headers, follow_redirects=follow_redirects),
+                    timeout or self.config.TOTAL_TIMEOUT,
+                )
+        except FETCH_ERRORS as e:
+            logger.debug(f"GET {url} failed: {type(e).__name__} {str(e)[:80]}")
+            return None
+
+    async def _probe(self, urls: List[str], accept: Accept,
+                     timeout: Optional[float]) -> Tuple[Optional[str], Optional[httpx.Response]]:
+        tasks = [asyncio.ensure_future(self._get(url, timeout, None, True)) for url in urls]
+        try:
+            for url, task in zip(urls, tasks):
+                response = await task
+                if response is not None and accept(response):
+                    return url, response
+            return None, None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _read_capped(self, url: str, headers: Optional[Dict[str, str]], max_bytes: int,
+                           content_types: Sequence[str], reader: Optional[TextReader]) -> CappedPage:
+        async with self._client().stream("GET", url, headers=headers) as response:
+            content_type = response.headers.get("content-type", "").lower()
+            if content_types and content_type and not any(t in content_type for t in content_types):
+                return CappedPage(url, response.status_code, content_type, "", True)
+
+            try:
+                decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            parts: List[str] = []
+            read, truncated = 0, False
+            async for chunk in response.aiter_bytes():
+                if read + len(chunk) > max_bytes:
+                    chunk, truncated = chunk[:max_bytes - read], True
+                read += len(chunk)
+                text = decoder.decode(chunk)
+                if reader is not None:
+                    if reader.feed(text):
+                        truncated = True
+                        break
+                else:
+                    parts.append(text)
+                if truncated:
+                    break
+            # leaving the block closes the stream; the rest is never downloaded
+            body = reader.result() if reader is not None else "".join(parts)
+            return CappedPage(url, response.status_code, content_type, body, truncated)
+
+    async def _get_capped(self, url: str, max_bytes: Optional[int], content_types: Sequence[str],
+                          reader: Optional[TextReader], timeout: Optional[float],
+                          headers: Optional[Dict[str, str]]) -> Optional[CappedPage]:
+        """Runs on the background loop"""
+        try:
+            async with self._host_limit(url), stage_limit("http"):
+                return await asyncio.wait_for(
+                    self._read_capped(url, headers, max_bytes or self.config.MAX_BYTES, content_types, reader),
+                    timeout or self.config.TOTAL_TIMEOUT,
+                )
+        except FETCH_ERRORS as e:
+            logger.debug(f"GET {url} failed: {type(e).__name__} {str(e)[:80]}")
+            return None
+
+    async def _get_capped_many(self, urls: List[str], max_bytes: Optional[int], content_types: Sequence[str],
+                               reader: Optional[Callable[[], TextReader]], deadline: Optional[float],
+                               timeout: Optional[float], headers: Optional[Dict[str, str]]) -> Dict[str, CappedPage]:
+        tasks = {
+            asyncio.ensure_future(self._get_capped(
+                url, max_bytes, content_types, reader() if reader else None, timeout, headers
+            )): url
+            for url in urls
+        }
+        if not tasks:
+            return {}
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.debug(f"get_capped_many: dropped {len(pending)} of {len(tasks)} URLs at the {deadline}s deadline")
+        return {tasks[task]: task.result() for task in done if task.result() is not None}
+
+    async def get(self, url: str, timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None,
+                  follow_redirects: bool = True) -> Optional[httpx.Response]:
+        """GET url from any event loop; None on network error or timeout"""
+        return await await_in_background(self._get(url, timeout, headers, follow_redirects))
+
+    def get_sync(self, url: str, timeout: Optional[float] = None, headers: Optional[Dict[str, str]] = None,
+                 follow_redirects: bool = True) -> Optional[httpx.Response]:
+        return run_sync(self._get(url, timeout, headers, follow_redirects))
+
+    async def probe(self, urls: List[str], accept: Accept = ok,
+                    timeout: Optional[float] = None) -> Tuple[Optional[str], Optional[httpx.Response]]:
+        """
+        Fetch all urls concurrently. Returns (url, response) for the first url,
+        in list order, whose response passes accept(); (None, None) if none do.
+        Requests still running once the answer is known are cancelled.
+        """
+        return await await_in_background(self._probe(list(urls), accept, timeout))
+
+    async def get_capped(self, url: str, max_bytes: Optional[int] = None,
+                         content_types: Sequence[str] = TEXT_TYPES, reader: Optional[TextReader] = None,
+                         timeout: Optional[float] = None,
+                         headers: Optional[Dict[str, str]] = None) -> Optional[CappedPage]:
+        """
+        Stream url, reading at most max_bytes (default HTTP_MAX_BYTES). Bodies
+        whose content type is not in content_types are not read. With a
+        reader, chunks are fed to it and the download stops when it is done.
+        """
+        return await await_in_background(self._get_capped(url, max_bytes, content_types, reader, timeout, headers))
+
+    def get_capped_many_sync(self, urls: List[str], max_bytes: Optional[int] = None,
+                             content_types: Sequence[str] = TEXT_TYPES,
+                             reader: Optional[Callable[[], TextReader]] = None, deadline: Optional[float] = None,
+                             timeout: Optional[float] = None,
+                             headers: Optional[Dict[str, str]] = None) -> Dict[str, CappedPage]:
+        """get_capped() for many urls under one deadline; reader() makes one reader per url"""
+        return run_sync(self._get_capped_many(list(dict.fromkeys(urls)), max_bytes, content_types,
+                                              reader, deadline, timeout, headers))
+
+    async def aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+
+http_fetcher = HttpFetcher()
+
+@atexit.register
+def _close_http_fetcher():
+    if http_fetcher._http is not None:
+        try:
+            run_sync(http_fetcher.aclose(), timeout=5)
+        except Exception:
+            pass
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Shared Async LLM Client
+=======================
+One Groq chat-completions client per process.
+
+- A single pooled, keep-alive httpx.AsyncClient (no TLS handshake per request)
+- Lives on the process-wide background loop, so it never blocks the caller's
+  event loop and is shared by async code, sync code and worker threads
+- Paces every request through rate_limiter and the "llm" stage limit
+- Persistent response cache keyed on model, messages, temperature and
+  max_tokens, so re-runs of the same sheet cost (almost) no LLM calls
+
+Usage:
+    text = await llm_client.complete(prompt, model="llama-3.1-8b-instant")
+    text = llm_client.complete_sync(prompt, model="llama-3.1-8b-instant")   # sync callers
+
+Both return "" when the request fails. Pass cache=False to force a fresh call,
+max_tokens=None to send no completion limit.
+"""
+
+import os
+import atexit
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from concurrency import await_in_background, run_sync, stage_limit
+from disk_cache import DiskCache, cache_path, make_key
+from rate_limiter import rate_limiter, estimate_tokens
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class LLMConfig:
+    API_KEY: str = os.getenv("GROQ_API_KEY", "")
+    BASE_URL: str = "https://api.groq.com/openai/v1"
+    DEFAULT_MODEL: str = "llama-3.1-8b-instant"
+    TIMEOUT: float = 60.0
+    MAX_CONNECTIONS: int = 32
+    MAX_KEEPALIVE: int = 16
+    MAX_RETRIES: int = 3
+    CACHE_ENABLED: bool = os.getenv("LLM_CACHE", "1") != "0"
+    CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400
+    CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+    UNCAPPED_ESTIMATE: int = 1024   # completion tokens reserved for rate limiting when max_tokens=None
+
+CONFIG = LLMConfig()
+
+# ============== CLIENT ==============
+
+class LLMClient:
+    """Async Groq client bound to the background loop"""
+
+    def __init__(self, config: LLMConfig = CONFIG):
+        self.config = config
+        self._http: Optional[httpx.AsyncClient] = None
+        self._cache: Optional[DiskCache] = None
+
+    def cache(self) -> Optional[DiskCache]:
+        if self._cache is None and self.config.CACHE_ENABLED:
+            self._cache = DiskCache(cache_path("llm_cache.sqlite3"),
+                                    ttl=self.config.CACHE_TTL,
+                                    max_bytes=self.config.CACHE_MAX_MB * 1024 * 1024)
+        return self._cache
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                base_url=self.config.BASE_URL,
+                headers={"Authorization": f"Bearer {self.config.API_KEY}"},
+                timeout=httpx.Timeout(self.config.TIMEOUT, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.config.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.config.MAX_KEEPALIVE,
+                ),
+            )
+        return self._http
+
+    async def _complete(self, messages: List[Dict[str, str]], model: str,
+                        max_tokens: Optional[int], temperature: float, use_cache: bool = True) -> str:
+        """Runs on the background loop; the SQLite cache is used from worker threads"""
+        cache = self.cache() if use_cache else None
+        key = make_key(model, messages, temperature, max_tokens)
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                return cached
+
+        text = await self._request(messages, model, max_tokens, temperature)
+        if text and cache is not None:
+            await asyncio.to_thread(cache.set, key, text)
+        return text
+
+    async def _request(self, messages: List[Dict[str, str]], model: str,
+                       max_tokens: Optional[int], temperature: float) -> str:
+        if not self.config.API_KEY:
+            return ""
+
+        estimated = estimate_tokens("".join(m["content"] for m in messages),
+                                    self.config.UNCAPPED_ESTIMATE if max_tokens is None else max_tokens)
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        if max_tokens is not None:   # None: no limit (the API's default)
+            payload["max_tokens"] = max_tokens
+
+        for attempt in range(self.config.MAX_RETRIES):
+            await rate_limiter.acquire(model, estimated)
+            try:
+                async with stage_limit("llm"):
+                    response = await self._client().post("/chat/completions", json=payload)
+            except httpx.HTTPError as e:
+                logger.warning(f"LLM request error ({model}): {str(e)[:80]}")
+                await asyncio.sleep(1)
+                continue
+
+            rate_limiter.update_from_headers(model, response.headers)
+
+            if response.status_code == 200:
+                data = response.json()
+                rate_limiter.record_usage(model, estimated, data.get("usage", {}).get("total_tokens"))
+                return (data["choices"][0]["message"]["content"] or "").strip()
+            if response.status_code == 429:
+                logger.warning(f"LLM rate limited ({model}), retrying when quota frees up")
+                rate_limiter.penalize(model, response.headers)
+                continue
+            if response.status_code >= 500:
+                await asyncio.sleep(1)
+                continue
+
+            logger.error(f"LLM request failed ({model}): HTTP {response.status_code} {response.text[:120]}")
+            return ""
+
+        logger.error(f"LLM request failed ({model}) after {self.config.MAX_RETRIES} attempts")
+        return ""
+
+    @staticmethod
+    def _messages(prompt: str, system: Optional[str]) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def complete(self, prompt: str, model: Optional[str] = None, max_tokens: Optional[int] = 500,
+                       temperature: float = 0.1, system: Optional[str] = None, cache: bool = True) -> str:
+        """Chat completion from any event loop"""
+        return await await_in_background(self._complete(
+            self._messages(prompt, system), model or self.config.DEFAULT_MODEL, max_tokens, temperature, cache
+        ))
+
+    def complete_sync(self, prompt: str, model: Optional[str] = None, max_tokens: Optional[int] = 500,
+                      temperature: float = 0.1, system: Optional[str] = None, cache: bool = True) -> str:
+        """Chat completion for synchronous callers (blocks the calling thread only)"""
+        return run_sync(self._complete(
+            self._messages(prompt, system), model or self.config.DEFAULT_MODEL, max_tokens, temperature, cache
+        ))
+
+    async def aclose(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+
+llm_client = LLMClient()
+
+@atexit.register
+def _close_llm_client():
+    if llm_client._http is not None:
+        try:
+            run_sync(llm_client.aclose(), timeout=5)
+        except Exception:
+            pass
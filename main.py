@@ -2200,15 +2200,26 @@ import json
 import logging
 import os
 import asyncio
+import itertools
 import time
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, asdict, replace
 from urllib.parse import urljoin, urlparse
 from dotenv import load_dotenv
 from website_finder_ai import find_official_website
 # Updated to use Universal Email Agent v5
 from universal_email_agent_v5 import UniversalEmailAgent
+from concurrency import RecordScheduler, stage_limit, domain_limit, await_in_background
+from llm_client import llm_client
+from search_service import search_service
+from http_fetcher import http_fetcher
+from browser_pool import browser_pool
+from checkpoint import CheckpointJournal, checkpoint_path, record_id
+from record_source import iter_records, normalize_record, read_frame
+from result_sink import ResultSink, open_sink
+from html_parsing import parse_html
 import concurrent.futures
+import contextvars
 import logging
 
 logger = logging.getLogger(__name__)
@@ -2216,10 +2227,6 @@ load_dotenv()
 
 try:
     from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
-    from groq import Groq
-    from ddgs import DDGS
-    import requests
-    from bs4 import BeautifulSoup
     from email_validator import validate_email, EmailNotValidError
     import pandas as pd
 except ImportError as e:
@@ -2281,17 +2288,32 @@ class AIEmailDiscoveryPipeline:
             logger.error("GROQ_API_KEY required!")
             exit(1)
         
-        self.groq = Groq(api_key=self.groq_api_key)
-        self.ddgs = DDGS()
-        
         browser_config = BrowserConfig(headless=True, verbose=False)
         self.crawler = AsyncWebCrawler(config=browser_config)
         
-        # AI Decision tracking
+        # AI Decision tracking (one log per record, records run concurrently)
+        self._decisions_log = contextvars.ContextVar('decisions_log')
         self.decisions_log = []
         
+        # Firm-level stage results shared by all rows of the same firm (per run)
+        self._firm_memo: Dict[Tuple, asyncio.Future] = {}
+        self._firm_users: Dict[Tuple, int] = {}   # rows waiting on / using each memo entry
+        self._stage_runs = 0
+        
         logger.info("🤖 REVISED AI-Driven Email Discovery Pipeline Initialized")
     
+    @property
+    def decisions_log(self) -> List[Dict]:
+        log = self._decisions_log.get(None)
+        if log is None:
+            log = []
+            self._decisions_log.set(log)
+        return log
+    
+    @decisions_log.setter
+    def decisions_log(self, value: List[Dict]):
+        self._decisions_log.set(value)
+    
     def log_ai_decision(self, stage: str, decision: str, confidence: float, reasoning: str):
         """Track all AI decisions for transparency"""
         self.decisions_log.append({
@@ -2303,21 +2325,65 @@ class AIEmailDiscoveryPipeline:
         })
         logger.info(f"🧠 AI [{stage}]: {decision} (confidence: {confidence:.2f})")
     
+    async def firm_stage(self, stage: str, key: Tuple, factory: Callable[[], Awaitable[Any]],
+                         keep: bool = True) -> Any:
+        """
+        Run a firm-level stage once per key. Rows of the same firm that arrive
+        while it is running await the same task. With keep, later rows get the
+        stored result for the rest of the run; without it (per-person stages)
+        the result is dropped once no row in flight is waiting for it.
+        AI decisions logged by the stage are added to every row that uses it.
+        """
+        memo_key = (stage,) + tuple(key)
+        task = self._firm_memo.get(memo_key)
+        if task is None:
+            task = self._firm_memo[memo_key] = asyncio.ensure_future(self._run_stage(factory))
+            self._stage_runs += 1
+            
+            def forget_done(t: asyncio.Future):
+                # a failed stage is retried by the next row instead of failing them all
+                if t.cancelled() or t.exception() is not None or not (keep or self._firm_users.get(memo_key)):
+                    self._forget_stage(memo_key, t)
+            
+            task.add_done_callback(forget_done)
+        else:
+            logger.info(f"♻️ Reusing firm-level {stage} result")
+        
+        self._firm_users[memo_key] = self._firm_users.get(memo_key, 0) + 1
+        try:
+            # shield: a cancelled row must not cancel the stage for the other rows
+            value, decisions = await asyncio.shield(task)
+        finally:
+            users = self._firm_users.pop(memo_key) - 1
+            if users:
+                self._firm_users[memo_key] = users
+            elif not keep and task.done():
+                self._forget_stage(memo_key, task)
+        self.decisions_log.extend(decisions)
+        return value
+    
+    async def _run_stage(self, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, List[Dict]]:
+        # The task runs in a copy of the first row's context: give the stage its
+        # own decision log so firm_stage can hand it to every row
+        self.decisions_log = []
+        value = await factory()
+        return value, list(self.decisions_log)
+    
+    def _forget_stage(self, memo_key: Tuple, task: asyncio.Future):
+        if self._firm_memo.get(memo_key) is task:
+            del self._firm_memo[memo_key]
+    
     async def llm_query(self, prompt: str, max_tokens: int = 500, temperature: float = 0.1) -> str:
         """Make LLM query with rate limiting"""
-        await asyncio.sleep(1.5)
-        
         try:
-            response = self.groq.chat.completions.create(
+            return await llm_client.complete(
+                prompt,
                 model="llama-3.1-8b-instant",
-                messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens,
                 temperature=temperature
             )
-            return response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"LLM query failed: {e}")
-            await asyncio.sleep(5)
             return ""
     
     # ============================================================================
@@ -2699,13 +2765,12 @@ class AIEmailDiscoveryPipeline:
         for i, query in enumerate(search_strategies, 1):
             logger.info(f"      Strategy {i}/{len(search_strategies)}: {query[:60]}...")
             try:
-                results = list(self.ddgs.text(query, max_results=5))
+                results = await self.web_search(query, max_results=5)
                 if results:
                     all_results.extend(results)
                     logger.info(f"         → {len(results)} results")
                     if len(all_results) >= 10:
                         break
-                await asyncio.sleep(2)
             except:
                 continue
         
@@ -2836,7 +2901,7 @@ Return JSON:
         search_query = f'"{name}" "{address}"'
         
         try:
-            results = list(self.ddgs.text(search_query, max_results=5))
+            results = await self.web_search(search_query, max_results=5)
             
             if not results:
                 logger.warning("   No web results, defaulting to law firm (per document)")
@@ -2959,8 +3024,9 @@ Return JSON:
         try:
             logger.info(f"🔍 Finding official website for: {firm_name}")
 
-            # Use the new AI Website Finder
-            result = find_official_website(firm_name, address)
+            # Use the new AI Website Finder (search, HTTP and LLM calls inside
+            # apply their own stage limits)
+            result = await asyncio.to_thread(find_official_website, firm_name, address)
 
             best_url   = result.get("best_url")
             reason     = result.get("reason", "")
@@ -3045,7 +3111,11 @@ Return JSON:
         logger.info(f"   Target practice areas: {', '.join(context.target_practice_areas)}")
         logger.info(f"   Target designations: {', '.join(context.preferred_designations[:3])}...")
     
-        professionals = await self.find_relevant_professionals(base_url, entity, context)
+        # Without an attorney the choice depends only on the firm and purpose
+        professionals = await self.firm_stage(
+            'professionals', (base_url, context.purpose, entity.resolved_firm_name or entity.raw_name),
+            lambda: self.find_relevant_professionals(base_url, entity, context)
+        )
         if professionals:
             logger.info(f"   ✅ Found {len(professionals)} relevant professional(s)")
             for i, prof in enumerate(professionals, 1):
@@ -3069,7 +3139,7 @@ Return JSON:
         logger.info(f"   Search query: {search_query}")
         
         try:
-            results = list(self.ddgs.text(search_query, max_results=5))
+            results = await self.web_search(search_query, max_results=5)
             
             if results:
                 # Filter for profile pages
@@ -3084,8 +3154,6 @@ Return JSON:
                         if attorney_name.lower() in title or attorney_name.lower() in snippet:
                             logger.info(f"   ✅ Found profile via search: {url}")
                             return url
-            
-            await asyncio.sleep(2)
         except Exception as e:
             logger.warning(f"   Profile search failed: {e}")
         
@@ -3097,17 +3165,14 @@ Return JSON:
             f'/team/{attorney_name.lower().replace(" ", "-")}',
         ]
         
-        for path in common_paths:
-            test_url = urljoin(base_url, path)
-            try:
-                response = requests.get(test_url, timeout=10, allow_redirects=True)
-                if response.status_code == 200 and attorney_name.lower() in response.text.lower():
-                    logger.info(f"   ✅ Found profile via pattern: {test_url}")
-                    return test_url
-            except:
-                pass
-        
-        return None
+        test_url, _ = await http_fetcher.probe(
+            [urljoin(base_url, path) for path in common_paths],
+            accept=lambda r: r.status_code == 200 and attorney_name.lower() in r.text.lower(),
+            timeout=10,
+        )
+        if test_url:
+            logger.info(f"   ✅ Found profile via pattern: {test_url}")
+        return test_url
     
     async def find_relevant_professionals(self, base_url: str, entity: EntityData,
                                          context: SearchContext) -> List[Dict]:
@@ -3153,7 +3218,7 @@ Return JSON:
         if not html:
             return None
         
-        soup = BeautifulSoup(html, 'html.parser')
+        page = parse_html(html)
         
         # Look for navigation links
         people_keywords = [
@@ -3163,12 +3228,11 @@ Return JSON:
         ]
         
         # Check all links
-        for link in soup.find_all('a', href=True):
-            text = link.get_text(strip=True).lower()
-            href = link['href']
+        for link in page.links(base_url):
+            text = link.text.lower()
             
             if any(keyword in text for keyword in people_keywords):
-                full_url = urljoin(base_url, href)
+                full_url = link.url
                 logger.info(f"   Found potential people section: {text} → {full_url}")
                 return full_url
         
@@ -3179,14 +3243,9 @@ Return JSON:
             '/about/team', '/en/people', '/en/team', '/en/professionals'
         ]
         
-        for path in common_paths:
-            test_url = urljoin(base_url, path)
-            try:
-                response = requests.get(test_url, timeout=10)
-                if response.status_code == 200:
-                    return test_url
-            except:
-                pass
+        test_url, _ = await http_fetcher.probe([urljoin(base_url, path) for path in common_paths], timeout=10)
+        if test_url:
+            return test_url
         
         return base_url  # Fallback to homepage
     
@@ -3196,19 +3255,19 @@ Return JSON:
         AI extracts and filters professionals from people page
         Implements filtering logic from document
         """
-        soup = BeautifulSoup(html, 'html.parser')
-        text = soup.get_text()[:8000]  # Limit for token management
+        page = parse_html(html)
+        text = page.text[:8000]  # Limit for token management
         
         # Extract any structured data
         people_links = []
-        for link in soup.find_all('a', href=True):
-            text_content = link.get_text(strip=True)
+        for link in page.links(page_url):
+            text_content = link.text
             if len(text_content) > 5 and len(text_content) < 100:
                 # Looks like a person name
                 if not any(word in text_content.lower() for word in ['practice', 'office', 'industry', 'service']):
                     people_links.append({
                         'text': text_content,
-                        'url': urljoin(page_url, link['href'])
+                        'url': link.url
                     })
         
         people_info = "\n".join([f"- {p['text']}: {p['url']}" for p in people_links[:50]])
@@ -3339,17 +3398,32 @@ Return UP TO 2 professionals. If none found, return empty array."""
             "type": "firm_general",
         }
     # ---------------------------------------------------------------------------
-    async def external_email_extractor(self, homepage_url: str, person_name: str) -> dict:
+    async def external_email_extractor(self, homepage_url: str, person_name: str,
+                                       firm_wide: bool = False) -> dict:
         """
         Run Universal Email Agent v5 to extract email from website.
         This replaces the old email_extraction_stage.find_email_from_site()
+        Person lookups run once per (site, name) at a time; rows in flight
+        together share the result, which is dropped once none of them needs it.
+        The firm-wide lookup (firm_wide=True) runs once per site for the whole run.
         """
+        return dict(await self.firm_stage(
+            'firm_email' if firm_wide else 'email',
+            (homepage_url, ' '.join(person_name.lower().split())),
+            lambda: self._run_email_agent(homepage_url, person_name),
+            keep=firm_wide
+        ))
+    
+    async def _run_email_agent(self, homepage_url: str, person_name: str) -> dict:
         try:
             logger.info(f"   🤖 Running Universal Email Agent v5 for: {person_name}")
 
             # Create and run the Universal Email Agent
             agent = UniversalEmailAgent(homepage_url, person_name)
-            result = await agent.run()
+            # One slot per agent; an agent keeps up to 1 + AGENT_PARALLEL_CANDIDATES
+            # pages open, so peak pages = MAX_CONCURRENT_BROWSER x that
+            async with stage_limit("browser"):
+                result = await agent.run()
 
             if not result or not result.get('email'):
                 logger.warning(f"   ⚠️ No email found for: {person_name}")
@@ -3418,7 +3492,9 @@ Return UP TO 2 professionals. If none found, return empty array."""
                     return result
 
         # Priority 3: Last fallback - firm-wide search
-        email_data = await self.external_email_extractor(base_url, entity.resolved_firm_name or entity.raw_name)
+        email_data = await self.external_email_extractor(
+            base_url, entity.resolved_firm_name or entity.raw_name, firm_wide=True
+        )
         if email_data.get('email'):
             result['general_email'] = email_data
         else:
@@ -3464,16 +3540,15 @@ Return UP TO 2 professionals. If none found, return empty array."""
         logger.warning("⚠️ safe_json_parse ultimate fallback: returning empty object")
         return {}
 
+    async def web_search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """DDGS text search through the shared cached, rate-limited search service"""
+        return await search_service.search(query, max_results)
+
     async def fetch_page(self, url: str) -> Optional[str]:
         """Fetch page content - EXISTING"""
-        try:
-            response = requests.get(url, timeout=15, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }, allow_redirects=True)
-            if response.status_code == 200:
-                return response.text
-        except:
-            pass
+        response = await http_fetcher.get(url, timeout=15)
+        if response is not None and response.status_code == 200:
+            return response.text
         return None
     
     # ============================================================================
@@ -3521,8 +3596,15 @@ Return UP TO 2 professionals. If none found, return empty array."""
             'ai_decisions': []
         }
         
-        # STAGE 1: Entity Type Detection
-        entity = await self.ai_detect_entity_type(raw_name, address, attorney_name)
+        # STAGE 1: Entity Type Detection (once per firm + address; the
+        # attorney only matters through whether one was provided)
+        firm = firm_key(raw_name, address)
+        has_attorney = bool(attorney_name and len(' '.join(attorney_name.split())) > 3)
+        entity = await self.firm_stage(
+            'entity', (firm, has_attorney),
+            lambda: self.ai_detect_entity_type(raw_name, address, attorney_name)
+        )
+        entity = entity_for_attorney(entity, attorney_name) if has_attorney else replace(entity)
         result['entity'] = asdict(entity)
         
         # Check if company
@@ -3551,7 +3633,9 @@ Return UP TO 2 professionals. If none found, return empty array."""
         logger.info(f"STAGE 2: WEBSITE DISCOVERY")
         logger.info(f"{'='*80}")
         
-        firm_url = await self.ai_search_and_validate_website(entity, context)
+        firm_url = await self.firm_stage(
+            'website', (firm,), lambda: self.ai_search_and_validate_website(replace(entity), context)
+        )
         
         if not firm_url:
             result['status'] = 'no_firm_website'
@@ -3559,18 +3643,21 @@ Return UP TO 2 professionals. If none found, return empty array."""
             return result
         
         result['firm_website'] = firm_url
+        entity.official_website = firm_url
         logger.info(f"✅ Verified Website: {firm_url}")
         
-        # STAGE 3: Identify professionals
-        professionals = await self.ai_identify_professionals(firm_url, entity, context)
-        result['professionals_identified'] = professionals
-        
-        # STAGE 4 & 5: Email extraction via intelligent crawl
-        logger.info(f"\n{'='*80}")
-        logger.info(f"STAGE 4: EMAIL EXTRACTION")
-        logger.info(f"{'='*80}")
-        
-        emails = await self.ai_intelligent_crawl(firm_url, entity, context, professionals)
+        # Stages 3-5 hit the firm's own site, so cap concurrent records per domain
+        async with domain_limit(firm_url):
+            # STAGE 3: Identify professionals
+            professionals = await self.ai_identify_professionals(firm_url, entity, context)
+            result['professionals_identified'] = professionals
+            
+            # STAGE 4 & 5: Email extraction via intelligent crawl
+            logger.info(f"\n{'='*80}")
+            logger.info(f"STAGE 4: EMAIL EXTRACTION")
+            logger.info(f"{'='*80}")
+            
+            emails = await self.ai_intelligent_crawl(firm_url, entity, context, professionals)
         
         if emails['personal_email']:
             result['professional_email'] = emails['personal_email']
@@ -3603,111 +3690,182 @@ Return UP TO 2 professionals. If none found, return empty array."""
         
         return result
     
-    async def process_all(self, records_data: List[Dict[str, str]], purpose: str) -> Dict:
-        """Process all records with purpose selection"""
+    async def process_all(self, records_data: Iterable[Dict[str, str]], purpose: str,
+                          max_concurrency: Optional[int] = None,
+                          journal: Optional[CheckpointJournal] = None,
+                          sink: Optional[ResultSink] = None) -> int:
+        """
+        Process all records concurrently with purpose selection.
+        Overall, per-domain and per-stage limits come from concurrency.CONFIG
+        (see concurrency.configure); max_concurrency overrides the record limit.
+        With a journal, every finished record is checkpointed and records
+        already in the journal are not processed again. With a sink, every
+        record is written out (with its checkpoint.record_id) as soon as it
+        is done; results are not kept in memory, read them back with
+        read_results(sink.path).
+        records_data may be any iterable (e.g. record_source.iter_records);
+        records are pulled only as slots free up.
+        Returns the number of records run.
+        """
         
-        results = {}
+        scheduler = RecordScheduler(max_concurrency)
+        total = len(records_data) if hasattr(records_data, '__len__') else '?'
+        self._firm_memo = {}
+        self._firm_users = {}
+        self._stage_runs = 0
+        done = journal.index() if journal else {}
         
         logger.info(f"\n{'='*100}")
         logger.info(f"🤖 REVISED AI-DRIVEN EMAIL DISCOVERY PIPELINE")
         logger.info(f"   Purpose: {purpose.upper()}")
-        logger.info(f"   Processing {len(records_data)} records")
+        logger.info(f"   Processing {total} records ({scheduler.max_records} at a time)")
+        if done:
+            logger.info(f"   Resuming: {len(done)} records already checkpointed")
         logger.info(f"{'='*100}\n")
         
-        for i, record_data in enumerate(records_data, 1):
-            logger.info(f"\n{'='*100}\n[{i}/{len(records_data)}] PROCESSING RECORD {i}\n{'='*100}")
+        async def run_record(i: int, record_data: Dict[str, str]):
+            rid, result = await process_one(i, record_data)
+            if sink and result.get('status') != 'empty_row':
+                sink.write({'record_id': rid, **result})
+        
+        async def process_one(i: int, record_data: Dict[str, str]) -> Tuple[str, Dict]:
+            rid = record_id(i, record_data)
+            if rid in done:
+                return rid, journal.read(done[rid])['result']
+            if not any(record_data.values()):
+                return rid, {'raw_data': record_data, 'status': 'empty_row'}
+            
+            logger.info(f"\n{'='*100}\n[{i}/{total}] PROCESSING RECORD {i}\n{'='*100}")
             
             try:
                 result = await self.process_record(record_data, purpose)
                 
                 # Use name as key
-                name_key = record_data.get('Name', record_data.get('Representative', f'Record_{i}'))
-                results[str(name_key)] = result
+                name_key = str(record_data.get('Name', record_data.get('Representative', f'Record_{i}')))
+                if journal:
+                    journal.append(rid, name_key, result)
+                return rid, result
                 
-                if i < len(records_data):
-                    logger.info(f"\n⏸️  Waiting before next record...")
-                    await asyncio.sleep(5)
-                    
-            except KeyboardInterrupt:
-                logger.warning("\n⚠️  Interrupted by user")
-                break
             except Exception as e:
                 logger.error(f"❌ Error: {e}")
                 import traceback
                 traceback.print_exc()
-                name_key = record_data.get('Name', f'Error_{i}')
-                results[str(name_key)] = {'status': 'error', 'error': str(e)}
+                return rid, {'raw_data': record_data, 'status': 'error', 'error': str(e)}
+        
+        count = await scheduler.run(records_data, run_record)
+        
+        if self._stage_runs:
+            logger.info(f"♻️ Shared stages: {self._stage_runs} stage runs for {count} records")
+        self._firm_memo = {}
+        self._firm_users = {}
         
-        return results
+        return count
+
+
+def firm_key(raw_name: str, address: str) -> str:
+    """Normalized firm + address, used to share firm-level stages between rows"""
+    def norm(value: str) -> str:
+        return ' '.join(re.sub(r'[^\w\s]', ' ', str(value or '').lower()).split())
+    return f"{norm(raw_name)}|{norm(address)}"
+
+
+def entity_for_attorney(entity: EntityData, attorney_name: str) -> EntityData:
+    """Copy of a firm-level entity with this row's attorney filled in"""
+    name = ' '.join(attorney_name.split())
+    if entity.entity_type != 'law_firm':
+        return replace(entity, attorney_name=name)
+    parts = name.split()
+    return replace(entity, attorney_name=name, full_name=name,
+                   first_name=parts[0] if parts else '',
+                   last_name=parts[-1] if len(parts) > 1 else '')
+
+
+def record_name(rid: str, result: Dict) -> str:
+    """Display name for a result keyed by record_id"""
+    raw = result.get('raw_data') or {}
+    return str(raw.get('Name') or raw.get('Representative') or rid)
+
+
+def read_results(path: str) -> Iterator[Tuple[str, Dict]]:
+    """(record_id, result) pairs streamed back from a JSONL result sink"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                yield result.pop('record_id', ''), result
 
 
-def print_results(results: Dict, purpose: str):
-    """Print results summary"""
+def print_results(results: Iterable[Tuple[str, Dict]], purpose: str, saved_to: Optional[str] = None):
+    """Print results summary (results are (record_id, result) pairs, e.g. read_results())"""
     
     print(f"\n{'='*100}")
     print(f"🤖 REVISED AI-DRIVEN EMAIL DISCOVERY - RESULTS")
     print(f"Purpose: {purpose.upper()}")
     print(f"{'='*100}")
     
-    companies_skipped = {}
-    attorney_emails = {}
-    professional_emails = {}
-    general_emails = {}
-    failed = {}
+    # Only the lines to print are kept per record, not the results themselves
+    companies_skipped = []
+    attorney_emails = []
+    professional_emails = []
+    general_emails = []
+    failed = []
+    total = 0
     
-    for name, result in results.items():
+    for rid, result in results:
         status = result.get('status', '')
+        if status == 'empty_row':
+            continue
+        total += 1
+        name = record_name(rid, result)
+        email_data = result.get('final_email') or {}
         if status == 'company_skipped':
-            companies_skipped[name] = result
+            companies_skipped.append(f"   - {name}")
         elif status == 'found_attorney_email':
-            attorney_emails[name] = result
+            entity = result.get('entity', {})
+            attorney_emails.append(
+                f"\n   {name}"
+                f"\n   👤 Attorney: {entity.get('full_name', 'N/A')}"
+                f"\n   📧 {email_data['email']}"
+                f"\n   🎯 Confidence: {email_data['confidence']:.0%}"
+                f"\n   🔗 {email_data['source_url']}")
         elif 'professional' in status:
-            professional_emails[name] = result
+            professional_emails.append(
+                f"\n   {name}"
+                f"\n   📧 {email_data['email']}"
+                f"\n   👔 Type: {purpose.title()} Professional"
+                f"\n   🎯 Confidence: {email_data['confidence']:.0%}")
         elif status == 'found_firm_general':
-            general_emails[name] = result
+            general_emails.append(f"\n   {name}\n   📧 {email_data['email']}")
         else:
-            failed[name] = result
+            failed.append(f"   {name}: {result.get('status', 'unknown')}")
     
     if companies_skipped:
         print(f"\n🏢 COMPANIES SKIPPED ({len(companies_skipped)}):")
-        for name in list(companies_skipped.keys())[:10]:
-            print(f"   - {name}")
+        for line in companies_skipped[:10]:
+            print(line)
         if len(companies_skipped) > 10:
             print(f"   ... and {len(companies_skipped) - 10} more")
     
     if attorney_emails:
         print(f"\n✅ ATTORNEY EMAILS FOUND ({len(attorney_emails)}):")
-        for name, result in attorney_emails.items():
-            email_data = result['final_email']
-            entity = result.get('entity', {})
-            print(f"\n   {name}")
-            print(f"   👤 Attorney: {entity.get('full_name', 'N/A')}")
-            print(f"   📧 {email_data['email']}")
-            print(f"   🎯 Confidence: {email_data['confidence']:.0%}")
-            print(f"   🔗 {email_data['source_url']}")
+        for line in attorney_emails:
+            print(line)
     
     if professional_emails:
         print(f"\n✅ {purpose.upper()} PROFESSIONAL EMAILS ({len(professional_emails)}):")
-        for name, result in professional_emails.items():
-            email_data = result['final_email']
-            print(f"\n   {name}")
-            print(f"   📧 {email_data['email']}")
-            print(f"   👔 Type: {purpose.title()} Professional")
-            print(f"   🎯 Confidence: {email_data['confidence']:.0%}")
+        for line in professional_emails:
+            print(line)
     
     if general_emails:
         print(f"\n⚠️  GENERAL EMAILS ({len(general_emails)}):")
-        for name, result in general_emails.items():
-            email_data = result['final_email']
-            print(f"\n   {name}")
-            print(f"   📧 {email_data['email']}")
+        for line in general_emails:
+            print(line)
     
     if failed:
         print(f"\n❌ FAILED ({len(failed)}):")
-        for name, result in failed.items():
-            print(f"   {name}: {result.get('status', 'unknown')}")
+        for line in failed:
+            print(line)
     
-    total = len(results)
     found = len(attorney_emails) + len(professional_emails) + len(general_emails)
     
     print(f"\n{'='*100}")
@@ -3724,44 +3882,68 @@ def print_results(results: Dict, purpose: str):
         print(f"   📈 Success Rate (excluding companies): {success_rate:.1f}%")
     print(f"{'='*100}\n")
     
-    # Save JSON
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
-    filename = f'revised_results_{purpose}_{timestamp}.json'
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
-    print(f"💾 Saved: {filename}\n")
+    if saved_to:
+        print(f"💾 Saved: {saved_to}\n")
 
 
-def load_from_excel(file_path: str) -> List[Dict[str, str]]:
-    """Load data from Excel - UPDATED for new column names"""
-    try:
-        df = pd.read_excel(file_path)
-        
-        # Map columns - support both old and new formats
-        records = []
-        for _, row in df.iterrows():
-            # Try new format first
-            name = row.get('Name', row.get('Representative', ''))
-            address = row.get('Address', row.get('Representative address', ''))
-            attorney = row.get('Attorney Name', row.get('Agent  name', ''))
-            
-            records.append({
-                'Name': str(name),
-                'Address': str(address),
-                'Attorney Name': str(attorney)
-            })
-        
-        logger.info(f"✅ Loaded {len(records)} records")
-        return records
-    except Exception as e:
-        logger.error(f"Failed to load Excel: {e}")
-        return []
+def frame_records(df: pd.DataFrame) -> List[Dict[str, str]]:
+    """Normalized records from a sheet in either the old or the new column format"""
+    return [normalize_record(row) for row in df.to_dict('records')]
+
+
+def load_from_excel(file_path: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream records from an Excel/CSV sheet - supports old and new column names.
+    The first record is read right away, so an unreadable file fails here
+    rather than after the run has started.
+    """
+    records = iter_records(file_path)
+    first = next(records, None)
+    logger.info(f"✅ Streaming records from {file_path}")
+    return itertools.chain([first], records) if first is not None else iter(())
+
+
+def export_row(result: Dict, purpose: str) -> Optional[Dict[str, str]]:
+    """Output columns for one result, None if the row should stay untouched"""
+    status = result.get('status', '')
+    if status == 'company_skipped':
+        return {'Law Firm / Company': 'company'}
+    if status in ['parse_error', 'error', 'empty_row']:
+        return None
+    
+    row = {}
+    entity_data = result.get('entity') or {}
+    final_email = result.get('final_email')
+    
+    # Set attorney name and salutation
+    if entity_data.get('attorney_name'):
+        first_name = entity_data.get('first_name', '').lower()
+        common_male = ['john', 'william', 'james', 'robert', 'michael', 'david', 
+                      'anthony', 'richard', 'paul', 'stephen']
+        row['Salutation'] = 'Mr.' if first_name in common_male else 'Ms.'
+        row['Attorney Name'] = entity_data.get('attorney_name', '')
+    
+    # Set email info
+    if final_email:
+        row['Email'] = final_email.get('email', '')
+        row['Webpage link'] = final_email.get('source_url', '')
+        
+        if status == 'found_attorney_email':
+            row['Email ID type (Personal / General)'] = 'Personal - Attorney'
+        elif 'professional' in status:
+            row['Email ID type (Personal / General)'] = f'Personal - {purpose.title()} Professional'
+        elif status == 'found_firm_general':
+            row['Email ID type (Personal / General)'] = 'General'
+    
+    row['Law Firm / Company'] = "law firm"
+    return row
 
 
-def export_to_excel(results: Dict, original_file: str, purpose: str):
-    """Export results to Excel - UPDATED"""
+def export_to_excel(results: Iterable[Tuple[str, Dict]], original_file: str, purpose: str):
+    """Export (record_id, result) pairs to Excel - rows are matched to results by record_id"""
     try:
-        df = pd.read_excel(original_file)
+        df = read_frame(original_file)
+        record_ids = [record_id(i, record) for i, record in enumerate(frame_records(df), 1)]
         
         # Map old to new column names if needed
         column_mapping = {
@@ -3779,46 +3961,18 @@ def export_to_excel(results: Dict, original_file: str, purpose: str):
                 df[col] = ''
             df[col] = df[col].astype(str)
         
-        for idx, row in df.iterrows():
-            name_key = str(row.get('Name', '')).strip()
-            
-            result = None
-            for key, res in results.items():
-                if name_key in str(key) or str(key) in name_key:
-                    result = res
-                    break
-            
-            if not result or result.get('status') in ['parse_error', 'error', 'company_skipped']:
-                if result and result.get('status') == 'company_skipped':
-                    df.at[idx, 'Law Firm / Company'] = 'company'
-                continue
-            
-            entity_data = result.get('entity', {})
-            final_email = result.get('final_email')
-            status = result.get('status', '')
-            
-            # Set attorney name and salutation
-            if entity_data.get('attorney_name'):
-                first_name = entity_data.get('first_name', '').lower()
-                common_male = ['john', 'william', 'james', 'robert', 'michael', 'david', 
-                              'anthony', 'richard', 'paul', 'stephen']
-                salutation = 'Mr.' if first_name in common_male else 'Ms.'
-                df.at[idx, 'Salutation'] = salutation
-                df.at[idx, 'Attorney Name'] = entity_data.get('attorney_name', '')
-            
-            # Set email info
-            if final_email:
-                df.at[idx, 'Email'] = final_email.get('email', '')
-                df.at[idx, 'Webpage link'] = final_email.get('source_url', '')
-                
-                if status == 'found_attorney_email':
-                    df.at[idx, 'Email ID type (Personal / General)'] = 'Personal - Attorney'
-                elif 'professional' in status:
-                    df.at[idx, 'Email ID type (Personal / General)'] = f'Personal - {purpose.title()} Professional'
-                elif status == 'found_firm_general':
-                    df.at[idx, 'Email ID type (Personal / General)'] = 'General'
-            
-            df.at[idx, 'Law Firm / Company'] = "law firm"
+        rows = {}
+        for rid, result in results:
+            row = export_row(result, purpose)
+            if row:
+                rows[rid] = row
+        
+        # One join on record_id, then bulk column updates
+        updates = pd.DataFrame.from_dict(rows, orient='index', columns=required_cols).reindex(record_ids)
+        for col in required_cols:
+            values = updates[col].to_numpy()
+            mask = updates[col].notna().to_numpy()
+            df.loc[mask, col] = values[mask]
         
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         output_file = f'revised_output_{purpose}_{timestamp}.xlsx'
@@ -3833,9 +3987,20 @@ def export_to_excel(results: Dict, original_file: str, purpose: str):
         traceback.print_exc()
 
 
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description="AI-driven email discovery pipeline")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip records already finished in the checkpoint journal")
+    parser.add_argument("--checkpoint", help="checkpoint journal path (default: checkpoints/<input>.<purpose>.jsonl)")
+    return parser.parse_args()
+
+
 async def main():
     """Main execution"""
     
+    args = parse_args()
+    
     if not os.getenv('GROQ_API_KEY'):
         print("❌ Set GROQ_API_KEY in .env file")
         return
@@ -3863,34 +4028,55 @@ async def main():
     print(f"\n✅ Selected: {purpose.upper()} search\n")
     
     pipeline = None
+    journal = None
+    sink = None
     try:
-        file_path = input("📁 Enter Excel file path: ").strip()
+        file_path = input("📁 Enter Excel/CSV file path: ").strip()
         if not os.path.exists(file_path):
             print(f"❌ File not found: {file_path}")
             return
         
         records_data = load_from_excel(file_path)
-        if not records_data:
-            return
+        
+        journal = CheckpointJournal(args.checkpoint or checkpoint_path(file_path, purpose))
+        if not args.resume:
+            journal.start_fresh()
+        print(f"📝 Checkpoint: {journal.path}" + (" (resuming)" if args.resume else ""))
+        
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        sink = open_sink(f'revised_results_{purpose}_{timestamp}.jsonl')
+        print(f"💾 Streaming results to: {sink.path}")
         
         pipeline = AIEmailDiscoveryPipeline()
-        results = await pipeline.process_all(records_data, purpose)
+        await pipeline.process_all(records_data, purpose, journal=journal, sink=sink)
+        sink.close()
         
-        print_results(results, purpose)
-        export_to_excel(results, file_path, purpose)
+        # Results are streamed back from the sink instead of being held in memory
+        print_results(read_results(sink.path), purpose, saved_to=sink.path)
+        export_to_excel(read_results(sink.path), file_path, purpose)
         
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n⚠️  Stopped by user")
+        if journal:
+            print(f"   Finished records are saved; rerun with --resume to continue")
     except Exception as e:
         print(f"\n❌ Error: {e}")
         import traceback
         traceback.print_exc()
     finally:
+        if sink:
+            sink.close()
+        if journal:
+            journal.close()
         if pipeline and hasattr(pipeline, 'crawler'):
             try:
                 await pipeline.crawler.aclose()
             except:
                 pass
+        try:
+            await await_in_background(browser_pool.close())
+        except Exception:
+            pass
 
 
 if __name__ == "__main__":
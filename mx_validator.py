@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Async MX Validator
+==================
+Check that an email domain accepts mail without blocking the event loop.
+
+- Lookups go through dns.asyncresolver
+- Results are cached per domain: positive answers for the record TTL
+  (clamped to MIN_TTL..MAX_TTL), NXDOMAIN / no-MX answers for NEGATIVE_TTL,
+  timeouts and other errors only for ERROR_TTL; SERVFAIL (NoNameservers)
+  is not cached at all
+- Concurrent lookups for the same domain share one query
+
+Usage:
+    if await mx_validator.validate(email):
+        ...
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+from concurrency import loop_state
+
+logger = logging.getLogger(__name__)
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class MXConfig:
+    LIFETIME: float = float(os.getenv("MX_LIFETIME", "5"))          # seconds per lookup
+    MIN_TTL: int = int(os.getenv("MX_MIN_TTL", "3600"))             # keep a domain for the whole run
+    MAX_TTL: int = int(os.getenv("MX_MAX_TTL", "86400"))
+    NEGATIVE_TTL: int = int(os.getenv("MX_NEGATIVE_TTL", "3600"))
+    ERROR_TTL: int = int(os.getenv("MX_ERROR_TTL", "60"))
+
+CONFIG = MXConfig()
+
+# ============== VALIDATOR ==============
+
+class MXValidator:
+    """Per-domain cached, de-duplicated MX lookups"""
+
+    def __init__(self, config: MXConfig = CONFIG):
+        self.config = config
+        self._cache: Dict[str, Tuple[bool, float]] = {}
+        self._lock = threading.Lock()
+        self._resolver: Optional[dns.asyncresolver.Resolver] = None
+
+    def _get_resolver(self) -> dns.asyncresolver.Resolver:
+        if self._resolver is None:
+            self._resolver = dns.asyncresolver.Resolver()
+        return self._resolver
+
+    def cached(self, domain: str) -> Optional[bool]:
+        """Cached answer for domain, or None if unknown/expired"""
+        with self._lock:
+            entry = self._cache.get(domain)
+            if entry is None:
+                return None
+            ok, expires = entry
+            if expires <= time.monotonic():
+                del self._cache[domain]
+                return None
+            return ok
+
+    def _store(self, domain: str, ok: bool, ttl: float):
+        with self._lock:
+            self._cache[domain] = (ok, time.monotonic() + ttl)
+
+    async def _lookup(self, domain: str) -> bool:
+        try:
+            answer = await self._get_resolver().resolve(domain, "MX", lifetime=self.config.LIFETIME)
+            ttl = min(max(answer.rrset.ttl, self.config.MIN_TTL), self.config.MAX_TTL)
+            ok = True
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            ok, ttl = False, self.config.NEGATIVE_TTL
+        except dns.resolver.NoNameservers as e:
+            # SERVFAIL/REFUSED from every nameserver says nothing about the
+            # domain; report it as unknown and ask again next time
+            logger.debug(f"MX lookup failed for {domain}: {e}")
+            return False
+        except (dns.exception.DNSException, OSError) as e:
+            logger.debug(f"MX lookup failed for {domain}: {e}")
+            ok, ttl = False, self.config.ERROR_TTL
+        self._store(domain, ok, ttl)
+        return ok
+
+    async def has_mx(self, domain: str) -> bool:
+        domain = domain.strip().lower().rstrip(".")
+        if not domain:
+            return False
+        ok = self.cached(domain)
+        if ok is not None:
+            return ok
+
+        inflight: Dict[str, asyncio.Task] = loop_state().setdefault("mx_inflight", {})
+        task = inflight.get(domain)
+        if task is None:
+            task = inflight[domain] = asyncio.ensure_future(self._lookup(domain))
+            task.add_done_callback(lambda _: inflight.pop(domain, None))
+        # shield: one caller being cancelled must not cancel the shared lookup
+        return await asyncio.shield(task)
+
+    async def validate(self, email: str) -> bool:
+        """True if the email's domain has MX records"""
+        if not email or "@" not in email:
+            return False
+        return await self.has_mx(email.rsplit("@", 1)[1])
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+mx_validator = MXValidator()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Page Renderer
+=============
+Render pages with the shared browser pool instead of launching Chromium per URL.
+
+- One pooled browser context per batch, pages rendered in parallel tabs
+  (RENDER_MAX_TABS at a time)
+- Images, fonts and media are never downloaded
+- Optional scrolling for lazily loaded directories
+- Sync wrappers for scripts that do not run an event loop
+
+Usage:
+    html, links = page_renderer.render_sync(url, scroll=True)
+    pages = page_renderer.render_many_sync(urls, scroll=lambda u: "/people" in u)
+    # pages[i] is (html, links), or None if urls[i] failed to render
+"""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Set, Tuple, Union
+from urllib.parse import urljoin
+
+from playwright.async_api import BrowserContext, Route, TimeoutError as PlaywrightTimeout
+
+from browser_pool import browser_pool
+from concurrency import await_in_background, run_sync
+
+logger = logging.getLogger(__name__)
+
+Rendered = Tuple[str, List[str]]
+ScrollRule = Union[bool, Callable[[str], bool]]
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class RenderConfig:
+    MAX_TABS: int = int(os.getenv("RENDER_MAX_TABS", "4"))
+    GOTO_TIMEOUT: int = 45000     # ms
+    SETTLE_TIMEOUT: int = 5000    # ms to wait for network idle after DOM load
+    SCROLL_PAUSE: int = 800       # ms between scroll steps
+    BLOCKED_RESOURCES: Set[str] = field(default_factory=lambda: {"image", "font", "media"})
+
+CONFIG = RenderConfig()
+
+LINKS_JS = "() => Array.from(document.querySelectorAll('a[href]'), a => a.getAttribute('href'))"
+
+# ============== RENDERER ==============
+
+class PageRenderer:
+    """Renders pages in tabs of one pooled browser context"""
+
+    def __init__(self, config: RenderConfig = CONFIG):
+        self.config = config
+
+    async def _block_heavy(self, route: Route):
+        if route.request.resource_type in self.config.BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _render(self, ctx: BrowserContext, url: str, scroll: bool, scroll_tries: int) -> Rendered:
+        page = await ctx.new_page()
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=self.config.GOTO_TIMEOUT)
+            try:
+                await page.wait_for_load_state("networkidle", timeout=self.config.SETTLE_TIMEOUT)
+            except PlaywrightTimeout:
+                pass
+
+            if scroll:
+                last_h = 0
+                for _ in range(scroll_tries):
+                    await page.mouse.wheel(0, 3000)
+                    await page.wait_for_timeout(self.config.SCROLL_PAUSE)
+                    new_h = await page.evaluate("document.body.scrollHeight")
+                    if new_h == last_h:
+                        break
+                    last_h = new_h
+
+            html = await page.content()
+            hrefs = await page.evaluate(LINKS_JS)
+            links = [urljoin(url, h.split("#")[0]) for h in hrefs if h]
+            return html, list(dict.fromkeys(links))
+        finally:
+            await page.close()
+
+    async def _render_many(self, urls: List[str], scroll: ScrollRule, scroll_tries: int,
+                           user_agent: Optional[str]) -> List[Optional[Rendered]]:
+        """Runs on the background loop"""
+        options = {"user_agent": user_agent} if user_agent else {}
+        tabs = asyncio.Semaphore(self.config.MAX_TABS)
+
+        async with browser_pool.context(**options) as ctx:
+            await ctx.route("**/*", self._block_heavy)
+
+            async def render_one(url: str) -> Optional[Rendered]:
+                do_scroll = scroll(url) if callable(scroll) else scroll
+                async with tabs:
+                    try:
+                        return await self._render(ctx, url, do_scroll, scroll_tries)
+                    except Exception as e:
+                        logger.debug(f"Render failed for {url}: {str(e)[:80]}")
+                        return None
+
+            return list(await asyncio.gather(*(render_one(u) for u in urls)))
+
+    async def render_many(self, urls: List[str], scroll: ScrollRule = False, scroll_tries: int = 5,
+                          user_agent: Optional[str] = None) -> List[Optional[Rendered]]:
+        """Render urls in parallel tabs; result i is (html, links) or None on failure"""
+        return await await_in_background(self._render_many(list(urls), scroll, scroll_tries, user_agent))
+
+    def render_many_sync(self, urls: List[str], scroll: ScrollRule = False, scroll_tries: int = 5,
+                         user_agent: Optional[str] = None) -> List[Optional[Rendered]]:
+        return run_sync(self._render_many(list(urls), scroll, scroll_tries, user_agent))
+
+    def render_sync(self, url: str, scroll: bool = False, scroll_tries: int = 5,
+                    user_agent: Optional[str] = None) -> Rendered:
+        """Render one page; raises RuntimeError if it could not be rendered"""
+        rendered = self.render_many_sync([url], scroll, scroll_tries, user_agent)[0]
+        if rendered is None:
+            raise RuntimeError(f"Failed to render {url}")
+        return rendered
+
+page_renderer = PageRenderer()
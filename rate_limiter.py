@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+LLM Rate Limiter
+================
+One process-wide token-bucket limiter shared by every Groq caller.
+
+- Separate buckets per model (requests/minute + tokens/minute)
+- Reservations are thread-safe, so sync and async callers share the same quota
+- Groq's x-ratelimit-* and retry-after headers keep the buckets in sync with
+  the server, so callers only wait when the quota is actually used up
+
+Usage:
+    wait = rate_limiter.reserve(model, estimate_tokens(prompt, max_tokens))
+    await rate_limiter.acquire(model, tokens)     # async callers
+    rate_limiter.acquire_sync(model, tokens)      # sync callers
+    rate_limiter.update_from_headers(model, response.headers)
+"""
+
+import re
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class ModelLimits:
+    requests_per_minute: int
+    tokens_per_minute: int
+
+# Groq free-tier defaults; the server headers override tokens/minute at runtime
+DEFAULT_LIMITS: Dict[str, ModelLimits] = {
+    "llama-3.1-8b-instant": ModelLimits(requests_per_minute=30, tokens_per_minute=6000),
+    "llama-3.3-70b-versatile": ModelLimits(requests_per_minute=30, tokens_per_minute=12000),
+}
+FALLBACK_LIMITS = ModelLimits(requests_per_minute=30, tokens_per_minute=6000)
+
+DEFAULT_BACKOFF = 2.0  # seconds to pause a model after a 429 without retry-after
+
+# ============== HELPERS ==============
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset durations like '7.66s', '2m59.56s', '1h2m' or '120ms' to seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+    """Rough token estimate (4 chars/token) plus the completion budget"""
+    return len(prompt or "") // 4 + max_tokens
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    try:
+        return headers.get(name)
+    except Exception:
+        return None
+
+# ============== TOKEN BUCKET ==============
+
+class TokenBucket:
+    """
+    Continuous-refill bucket. reserve() always succeeds and returns how long
+    the caller must wait; the level may go negative so concurrent callers
+    queue up behind each other instead of all waking at once.
+    """
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float, now: float):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, remaining: float, now: float, capacity: Optional[float] = None):
+        """Never allow more than the server says is left"""
+        if capacity and capacity != self.capacity:
+            self.capacity = float(capacity)
+            self.rate = self.capacity / 60.0
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+# ============== RATE LIMITER ==============
+
+class _ModelState:
+    def __init__(self, limits: ModelLimits):
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+        self.blocked_until = 0.0
+
+class RateLimiter:
+    """Per-model request and token buckets shared across threads and event loops"""
+
+    def __init__(self, limits: Optional[Dict[str, ModelLimits]] = None):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self._models: Dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelState(self.limits.get(model, FALLBACK_LIMITS))
+        return state
+
+    def set_limits(self, model: str, requests_per_minute: int, tokens_per_minute: int):
+        with self._lock:
+            self.limits[model] = ModelLimits(requests_per_minute, tokens_per_minute)
+            self._models.pop(model, None)
+
+    def reserve(self, model: str, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens; returns seconds to wait first"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(model)
+            wait = max(state.requests.reserve(1, now), state.tokens.reserve(tokens, now))
+            return max(wait, state.blocked_until - now)
+
+    async def acquire(self, model: str, tokens: int):
+        wait = self.reserve(model, tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.1f}s for {model}")
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, model: str, tokens: int):
+        wait = self.reserve(model, tokens)
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.1f}s for {model}")
+            time.sleep(wait)
+
+    def record_usage(self, model: str, estimated: int, actual: Optional[int]):
+        """Correct the token bucket once the real usage is known"""
+        if actual is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(model)
+            if actual < estimated:
+                state.tokens.refund(estimated - actual, now)
+            elif actual > estimated:
+                state.tokens.reserve(actual - estimated, now)
+
+    def update_from_headers(self, model: str, headers: Mapping[str, str]):
+        """
+        Apply Groq's rate-limit headers:
+          x-ratelimit-limit-tokens / remaining-tokens / reset-tokens   (per minute)
+          x-ratelimit-remaining-requests / reset-requests              (per day)
+          retry-after                                                  (on 429)
+        """
+        if not headers:
+            return
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(model)
+
+            try:
+                remaining_tokens = _header(headers, "x-ratelimit-remaining-tokens")
+                if remaining_tokens is not None:
+                    limit_tokens = _header(headers, "x-ratelimit-limit-tokens")
+                    state.tokens.sync(float(remaining_tokens), now,
+                                      float(limit_tokens) if limit_tokens else None)
+                    if float(remaining_tokens) <= 0:
+                        reset = parse_duration(_header(headers, "x-ratelimit-reset-tokens"))
+                        if reset:
+                            state.blocked_until = max(state.blocked_until, now + reset)
+
+                remaining_requests = _header(headers, "x-ratelimit-remaining-requests")
+                if remaining_requests is not None and float(remaining_requests) <= 0:
+                    reset = parse_duration(_header(headers, "x-ratelimit-reset-requests"))
+                    if reset:
+                        state.blocked_until = max(state.blocked_until, now + reset)
+            except ValueError:
+                pass
+
+            retry_after = parse_duration(_header(headers, "retry-after"))
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+
+    def penalize(self, model: str, headers: Optional[Mapping[str, str]] = None):
+        """Handle a 429: honour retry-after if given, otherwise back off briefly"""
+        self.update_from_headers(model, headers or {})
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(model)
+            if state.blocked_until <= now:
+                state.blocked_until = now + DEFAULT_BACKOFF
+
+# Shared by main.py, universal_email_agent_v5.py and website_finder_ai.py
+rate_limiter = RateLimiter()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Streaming Record Source
+=======================
+Read input sheets row by row instead of loading them whole.
+
+- .xlsx/.xlsm through openpyxl read-only mode, .csv through csv.DictReader
+  (.xls falls back to pandas, which has to load the file)
+- Records are yielded as they are read, so processing starts on the first
+  row and memory stays flat on very large sheets
+- Old (Representative / Representative address / Agent  name) and new
+  (Name / Address / Attorney Name) column schemas are both accepted
+
+Usage:
+    for record in iter_records("input.xlsx"):
+        record['Name'], record['Address'], record['Attorney Name']
+"""
+
+import os
+import csv
+import math
+import logging
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Output field -> accepted input columns (new format first)
+INPUT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'Name': ('Name', 'Representative'),
+    'Address': ('Address', 'Representative address'),
+    'Attorney Name': ('Attorney Name', 'Agent  name'),
+}
+
+def clean_value(value: Any) -> str:
+    """Cell value as text; empty cells (None/NaN) become ''"""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    return str(value).strip()
+
+def normalize_record(row: Mapping[str, Any], fields: Mapping[str, Sequence[str]] = INPUT_COLUMNS) -> Dict[str, str]:
+    """Map a raw row (either schema) to the pipeline's field names"""
+    record = {}
+    for field, candidates in fields.items():
+        source = next((c for c in candidates if c in row), None)
+        record[field] = clean_value(row[source]) if source else ''
+    return record
+
+# ============== RAW ROW READERS ==============
+
+def _iter_xlsx(path: str, sheet: Optional[str]) -> Iterator[Dict[str, Any]]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.active
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h) if h is not None else f'column_{i}' for i, h in enumerate(header)]
+        # Blank rows inside the sheet are kept (as pandas does) so row numbers
+        # line up with pd.read_excel; trailing blank rows are dropped
+        blank = 0
+        for values in rows:
+            if all(v is None for v in values):
+                blank += 1
+                continue
+            for _ in range(blank):
+                yield dict.fromkeys(header)
+            blank = 0
+            yield dict(zip(header, values))
+    finally:
+        wb.close()
+
+def _iter_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {(k or '').strip(): v for k, v in row.items()}
+
+def _iter_legacy_excel(path: str, sheet: Optional[str]) -> Iterator[Dict[str, Any]]:
+    import pandas as pd
+
+    df = pd.read_excel(path, sheet_name=sheet or 0)
+    for row in df.to_dict('records'):
+        yield row
+
+def read_frame(path: str, sheet: Optional[str] = None):
+    """Whole file as a DataFrame, row-aligned with iter_rows()"""
+    import pandas as pd
+
+    if os.path.splitext(path)[1].lower() == '.csv':
+        return pd.read_csv(path, dtype=str, encoding='utf-8-sig')
+    return pd.read_excel(path, sheet_name=sheet or 0)
+
+def iter_rows(path: str, sheet: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Raw {column: value} rows of an .xlsx/.xlsm/.xls/.csv file"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        return _iter_xlsx(path, sheet)
+    if ext == '.csv':
+        return _iter_csv(path)
+    if ext == '.xls':
+        return _iter_legacy_excel(path, sheet)
+    raise ValueError(f"Unsupported input file type: {path}")
+
+def iter_records(path: str, sheet: Optional[str] = None,
+                 fields: Mapping[str, Sequence[str]] = INPUT_COLUMNS) -> Iterator[Dict[str, str]]:
+    """
+    Normalized records, one per input row. Blank rows inside the sheet are
+    yielded too (all fields ''), so record numbers match the row numbers.
+    An unsupported file type raises right away, not on the first record.
+    """
+    rows = iter_rows(path, sheet)
+    return (normalize_record(row, fields) for row in rows)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Streaming Result Sink
+=====================
+Append results to disk as each record finishes instead of holding them all
+and writing once at the end.
+
+- .jsonl: one JSON object per line (any nesting)
+- .csv:   flat rows, columns from `fieldnames` or the first record
+- .xlsx:  openpyxl write-only workbook (rows stream to a temp file; the
+          workbook itself is only complete after close())
+- Buffered writes are flushed every FLUSH_EVERY records or FLUSH_INTERVAL
+  seconds, so JSONL/CSV output is usable while the run is still going
+
+Usage:
+    with open_sink("results.csv", fieldnames=HEADERS) as sink:
+        for result in results:
+            sink.write(result)
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = int(os.getenv("RESULT_FLUSH_EVERY", "20"))
+FLUSH_INTERVAL = float(os.getenv("RESULT_FLUSH_INTERVAL", "10"))
+
+# ============== SINKS ==============
+
+class ResultSink:
+    """Base sink: thread-safe write() with scheduled flushing"""
+
+    def __init__(self, path: str, fieldnames: Optional[Sequence[str]] = None,
+                 flush_every: int = FLUSH_EVERY, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.fieldnames: Optional[List[str]] = list(fieldnames) if fieldnames else None
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _write(self, record: Dict[str, Any]):
+        raise NotImplementedError
+
+    def _flush(self):
+        pass
+
+    def _close(self):
+        pass
+
+    def write(self, record: Dict[str, Any]):
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Result sink {self.path} is closed")
+            self._write(record)
+            self.count += 1
+            self._unflushed += 1
+            if (self._unflushed >= self.flush_every
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._close()
+            self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JsonlSink(ResultSink):
+    def __init__(self, path: str, *args, **kwargs):
+        super().__init__(path, *args, **kwargs)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _flush(self):
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+class CsvSink(ResultSink):
+    def __init__(self, path: str, *args, **kwargs):
+        super().__init__(path, *args, **kwargs)
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer: Optional[csv.DictWriter] = None
+
+    def _write(self, record: Dict[str, Any]):
+        if self._writer is None:
+            self.fieldnames = self.fieldnames or list(record)
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(record)
+
+    def _flush(self):
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+class XlsxSink(ResultSink):
+    def __init__(self, path: str, *args, **kwargs):
+        super().__init__(path, *args, **kwargs)
+        from openpyxl import Workbook
+
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._header_written = False
+
+    def _write(self, record: Dict[str, Any]):
+        if not self._header_written:
+            self.fieldnames = self.fieldnames or list(record)
+            self._ws.append(self.fieldnames)
+            self._header_written = True
+        self._ws.append([_cell(record.get(f)) for f in self.fieldnames])
+
+    def _close(self):
+        if not self._header_written and self.fieldnames:
+            self._ws.append(self.fieldnames)
+        self._wb.save(self.path)
+
+def _cell(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+SINKS = {'.jsonl': JsonlSink, '.csv': CsvSink, '.xlsx': XlsxSink}
+
+def open_sink(path: str, fieldnames: Optional[Sequence[str]] = None, **kwargs) -> ResultSink:
+    """Sink for path, chosen by extension (.jsonl, .csv, .xlsx)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SINKS:
+        raise ValueError(f"Unsupported result file type: {path}")
+    return SINKS[ext](path, fieldnames, **kwargs)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Search Service
+==============
+One cached, rate-limited DuckDuckGo search shared by every caller.
+
+- Results cached on disk (cache/search_cache.sqlite3) with TTL, so repeat
+  runs never hit the search engine for a query they have already made
+- Process-wide pacing (token bucket), so concurrent records share one
+  query budget instead of each sleeping on their own
+- Identical queries already in flight are merged: the second caller waits
+  for the first one's results
+- Every result is a dict with href, title and body
+
+Usage:
+    results = await search_service.search(query, max_results=5)   # async callers
+    results = search_service.search_sync(query, max_results=5)     # sync callers
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from ddgs import DDGS
+
+from concurrency import stage_limit
+from disk_cache import DiskCache, cache_path, make_key
+from rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# ============== CONFIGURATION ==============
+
+@dataclass
+class SearchConfig:
+    CACHE_TTL: float = float(os.getenv("SEARCH_CACHE_TTL_DAYS", "14")) * 86400
+    QUERIES_PER_MINUTE: float = float(os.getenv("SEARCH_QUERIES_PER_MINUTE", "30"))
+    BURST: int = int(os.getenv("SEARCH_BURST", "3"))
+    MAX_RETRIES: int = 2
+    RETRY_BACKOFF: float = 5.0
+
+CONFIG = SearchConfig()
+
+# ============== SEARCH SERVICE ==============
+
+class SearchService:
+    """Cached, paced and de-duplicated DDGS text search"""
+
+    def __init__(self, config: SearchConfig = CONFIG):
+        self.config = config
+        self.cache = DiskCache(cache_path("search_cache.sqlite3"), ttl=config.CACHE_TTL)
+        burst = max(1, config.BURST)
+        self._pace = TokenBucket(burst, per_seconds=burst * 60.0 / max(config.QUERIES_PER_MINUTE, 0.1))
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "concurrent.futures.Future[List[Dict]]"] = {}
+        self._local = threading.local()
+
+    @staticmethod
+    def _key(query: str, max_results: int) -> str:
+        # v2: entries are result dicts; unversioned "ddgs" keys hold plain URL lists
+        return make_key("ddgs-v2", query.strip(), max_results)
+
+    def _ddgs(self) -> DDGS:
+        # DDGS keeps a requests session, so give each thread its own
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            ddgs = self._local.ddgs = DDGS()
+        return ddgs
+
+    def _wait_for_slot(self):
+        with self._lock:
+            wait = self._pace.reserve(1, time.monotonic())
+        if wait > 0:
+            time.sleep(wait)
+
+    def _fetch(self, query: str, max_results: int) -> List[Dict]:
+        for attempt in range(self.config.MAX_RETRIES + 1):
+            self._wait_for_slot()
+            try:
+                raw = self._ddgs().text(query, max_results=max_results) or []
+                break
+            except Exception as e:
+                if attempt == self.config.MAX_RETRIES:
+                    raise
+                logger.warning(f"Search failed ({str(e)[:60]}), retrying: {query[:60]}")
+                time.sleep(self.config.RETRY_BACKOFF * (attempt + 1))
+
+        results = []
+        for r in raw:
+            if isinstance(r, dict) and r.get("href"):
+                results.append({"href": r["href"], "title": r.get("title", ""), "body": r.get("body", "")})
+            elif isinstance(r, str):
+                results.append({"href": r, "title": "", "body": ""})
+        return results
+
+    def cached(self, query: str, max_results: int = 5) -> Optional[List[Dict]]:
+        results = self.cache.get(self._key(query, max_results))
+        if not isinstance(results, list) or not all(isinstance(r, dict) and "href" in r for r in results):
+            return None
+        return results
+
+    def search_sync(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Search for query, blocking the calling thread; raises if the search engine fails"""
+        cached = self.cached(query, max_results)
+        if cached is not None:
+            return cached
+
+        key = self._key(query, max_results)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = concurrent.futures.Future()
+        if not owner:
+            return future.result()
+
+        try:
+            results = self._fetch(query, max_results)
+            self.cache.set(key, results)
+            future.set_result(results)
+            return results
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        """Search for query without blocking the event loop"""
+        cached = await asyncio.to_thread(self.cached, query, max_results)
+        if cached is not None:
+            return cached
+        async with stage_limit("search"):
+            return await asyncio.to_thread(self.search_sync, query, max_results)
+
+# Shared by main.py and website_finder_ai.py
+search_service = SearchService()
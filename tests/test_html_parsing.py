@@ -0,0 +1,24 @@
+import pytest
+
+import html_parsing
+
+COMMENT_MARKUP = (
+    '<div><!-- contact block --> Email: jane.doe@firm.com, Partner</div>'
+    '<p>Litigation<!--x--> and Tax</p>'
+    '<a href="/p/jane"><!-- name -->Jane Doe</a>'
+)
+
+@pytest.mark.skipif(html_parsing.lxml is None, reason="lxml not installed")
+@pytest.mark.parametrize("markup", [
+    COMMENT_MARKUP,
+    '<html><body><p>a<script>x<!--c-->y</script>b<a href="x">c<b>d</b>e</a>f</p><!--end-->g</body></html>',
+    '<?xml version="1.0" encoding="utf-8"?><html><body><?pi x?>before <i>it</i> after</body></html>',
+])
+def test_lxml_matches_stdlib(markup):
+    assert html_parsing._parse_lxml(markup) == html_parsing._parse_stdlib(markup)
+
+def test_comment_tail_text_is_kept():
+    page = html_parsing.parse_html(COMMENT_MARKUP)
+    assert "jane.doe@firm.com" in page.text
+    assert "and Tax" in page.text
+    assert page.anchors == (("/p/jane", "Jane Doe"),)
@@ -0,0 +1,39 @@
+import pytest
+
+website_finder_ai = pytest.importorskip("website_finder_ai")
+from disk_cache import DiskCache
+
+@pytest.fixture
+def website_cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "website_cache.sqlite3"), ttl=3600)
+    monkeypatch.setattr(website_finder_ai, "website_cache", cache)
+    return cache
+
+def select(result):
+    return lambda firm, address, debug=False: dict(result)
+
+def test_clear_winner_is_not_cached(website_cache, monkeypatch):
+    monkeypatch.setattr(website_finder_ai, "select_website", select({
+        "best_url": "https://firm.com/", "confidence": 0.85,
+        "reason": "search ranking: clear winner", "summary": "", "cacheable": False,
+    }))
+    result = website_finder_ai.find_official_website("Firm LLP", "Boston")
+    assert result["best_url"] == "https://firm.com/"
+    assert "cacheable" not in result
+    assert website_finder_ai.cached_website("Firm LLP", "Boston") == {}
+
+def test_verified_pick_is_cached(website_cache, monkeypatch):
+    monkeypatch.setattr(website_finder_ai, "select_website", select({
+        "best_url": "https://firm.com/", "confidence": 0.9, "reason": "llm", "summary": "",
+    }))
+    website_finder_ai.find_official_website("Firm LLP", "Boston")
+    assert website_finder_ai.cached_website("Firm LLP", "Boston")["best_url"] == "https://firm.com/"
+
+def test_llm_outage_fallback_is_not_cached(website_cache, monkeypatch):
+    monkeypatch.setattr(website_finder_ai, "fetch_texts", lambda urls, *a, **k: {u: "Firm LLP home" for u in urls})
+    monkeypatch.setattr(website_finder_ai, "ai_chat", lambda prompt: "")
+    candidates = [{"href": "https://www.firm.com/", "title": "Firm LLP", "body": ""}]
+    result = website_finder_ai.ai_select_best_site("Firm LLP", "Boston", candidates)
+    assert result["reason"] == "token fallback"
+    website_finder_ai.store_website("Firm LLP", "Boston", result)
+    assert website_finder_ai.cached_website("Firm LLP", "Boston") == {}
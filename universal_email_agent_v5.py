@@ -21,14 +21,18 @@ import json
 import re
 import asyncio
 from urllib.parse import urljoin, urlparse
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass
 
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from bs4 import BeautifulSoup
+from playwright.async_api import Page
 from dotenv import load_dotenv
-import httpx
-import dns.resolver
+
+from llm_client import llm_client
+from browser_pool import browser_pool
+from concurrency import await_in_background
+from mx_validator import mx_validator
+from email_decoder import find_emails_in
+from html_parsing import parse_html
 
 # ============== CONFIGURATION ==============
 
@@ -40,9 +44,13 @@ class Config:
     MODEL: str = "llama-3.3-70b-versatile"
     MODEL_FAST: str = "llama-3.1-8b-instant"
     MAX_CANDIDATES: int = 10
+    PARALLEL_CANDIDATES: int = int(os.getenv("AGENT_PARALLEL_CANDIDATES", "4"))
     PAGE_TIMEOUT: int = 60000
     ELEMENT_TIMEOUT: int = 10000
     MIN_CONFIDENCE: int = 65
+    DOM_QUIET_MS: int = int(os.getenv("AGENT_DOM_QUIET_MS", "500"))
+    VERIFY_TEXT_CHARS: int = 2500       # page text the profile verifier reads
+    HARVEST_MAX_CANDIDATES: int = int(os.getenv("AGENT_HARVEST_MAX_CANDIDATES", "500"))
     HEADLESS: bool = True
 
 CONFIG = Config()
@@ -76,6 +84,42 @@ AVOID_URL_PATTERNS = [
     '/sitemap', '/rss', '/feed', 'linkedin.com', 'twitter.com', 'facebook.com'
 ]
 
+PREFERRED_CONTACT_PREFIXES = [
+    'info@', 'contact@', 'enquiries@', 'enquiry@', 'office@',
+    'mail@', 'hello@', 'general@', 'reception@', 'admin@'
+]
+
+def compile_literals(words: List[str], anchored: bool = False) -> "re.Pattern":
+    """
+    One regex matching any of words. Alternatives are factored into a trie,
+    so each position is checked against a single branch per character
+    instead of every word in turn.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        end = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            body = "(?:" + body + ")?"
+        return body
+
+    return re.compile(("^" if anchored else "") + build(trie))
+
+# Compiled once; used for every anchor/email classified
+GENERIC_EMAIL_RE = compile_literals(GENERIC_EMAIL_PREFIXES, anchored=True)
+PROFILE_URL_RE = compile_literals(PROFILE_URL_PATTERNS)
+AVOID_URL_RE = compile_literals(AVOID_URL_PATTERNS)
+PREFERRED_CONTACT_RE = compile_literals(PREFERRED_CONTACT_PREFIXES, anchored=True)
+
 # ============== LOGGING ==============
 
 def log(level: str, msg: str, indent: int = 0):
@@ -92,43 +136,21 @@ def log(level: str, msg: str, indent: int = 0):
 # ============== LLM FUNCTIONS ==============
 
 async def call_llm(system_prompt: str, user_prompt: str, max_tokens: int = 500, fast: bool = False) -> str:
-    """Call LLM with retry logic"""
+    """Call LLM through the shared client (retries and rate limiting included)"""
     if not CONFIG.GROQ_API_KEY:
         return "{}"
 
     model = CONFIG.MODEL_FAST if fast else CONFIG.MODEL
 
-    for attempt in range(3):
-        try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {CONFIG.GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "temperature": 0,
-                        "max_tokens": max_tokens
-                    }
-                )
-
-                if response.status_code == 200:
-                    return response.json()["choices"][0]["message"]["content"]
-                elif response.status_code == 429:
-                    await asyncio.sleep(2 ** attempt)
-                    continue
-        except Exception as e:
-            if attempt == 2:
-                log('warn', f"LLM error: {str(e)[:40]}")
-            await asyncio.sleep(1)
+    try:
+        response = await llm_client.complete(
+            user_prompt, model=model, max_tokens=max_tokens, temperature=0, system=system_prompt
+        )
+    except Exception as e:
+        log('warn', f"LLM error: {str(e)[:40]}")
+        response = ""
 
-    return "{}"
+    return response or "{}"
 
 def parse_json(response: str) -> dict:
     """Safely parse JSON from LLM response"""
@@ -281,7 +303,7 @@ CRITICAL VERIFICATION RULES:
 6. Only extract email that belongs to {target_name}, not other people mentioned
 
 PAGE CONTENT (excerpt):
-{page_text[:2500]}
+{page_text[:CONFIG.VERIFY_TEXT_CHARS]}
 
 Return JSON:
 {{
@@ -303,31 +325,24 @@ Return JSON:
 
 # ============== UTILITY FUNCTIONS ==============
 
-def validate_email_mx(email: str) -> bool:
-    """Validate email domain has MX records"""
-    if not email or "@" not in email:
-        return False
-    try:
-        domain = email.split("@")[1]
-        dns.resolver.resolve(domain, "MX", lifetime=5)
-        return True
-    except:
-        return False
+async def validate_email_mx(email: str) -> bool:
+    """Validate email domain has MX records (async, cached per domain)"""
+    return await mx_validator.validate(email)
 
 def is_valid_email(email: str) -> bool:
     """Check if email is valid and not generic"""
     if not email or "@" not in email:
         return False
     email_lower = email.lower()
-    return not any(email_lower.startswith(prefix) for prefix in GENERIC_EMAIL_PREFIXES)
+    return GENERIC_EMAIL_RE.match(email_lower) is None
 
 def is_profile_url(url: str) -> bool:
     url_lower = url.lower()
-    return any(p in url_lower for p in PROFILE_URL_PATTERNS)
+    return PROFILE_URL_RE.search(url_lower) is not None
 
 def should_skip_url(url: str) -> bool:
     url_lower = url.lower()
-    return any(p in url_lower for p in AVOID_URL_PATTERNS)
+    return AVOID_URL_RE.search(url_lower) is not None
 
 def name_in_url(url: str, name: str) -> bool:
     """Check if name parts appear in URL"""
@@ -337,28 +352,69 @@ def name_in_url(url: str, name: str) -> bool:
 
 # ============== PAGE FUNCTIONS ==============
 
-async def wait_for_page_ready(page: Page, timeout: int = 10000):
-    """Wait for page to be fully interactive"""
-    try:
-        await page.wait_for_load_state("networkidle", timeout=timeout)
-    except:
-        pass
-
-    try:
-        await page.wait_for_function("() => document.readyState === 'complete'", timeout=5000)
-    except:
-        pass
-
-    # Wait for any lazy-loaded content
-    try:
-        await page.wait_for_function(
-            "() => !document.querySelector('.loading, .spinner, [class*=\"loading\"]')",
-            timeout=5000
-        )
-    except:
-        pass
+# Resolves once the DOM has had no mutations for `quiet` ms and no loading
+# indicator is shown, as soon as `selector` matches, or after `maxWait` ms.
+# With `needChange` the quiet window only starts after the first mutation.
+# Busy = a visible loading indicator. Exact class names only: substring
+# matches such as [class*="loading"] also hit permanent classes (lazy-loading).
+# With needChange, only elements matching selector that were not there at the
+# start count as found.
+DOM_STABLE_JS = """([quiet, maxWait, selector, needChange]) => new Promise(resolve => {
+    const BUSY = '.loading, .is-loading, .spinner, .searching, [aria-busy="true"]';
+    const visible = el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+    const busy = () => Array.from(document.querySelectorAll(BUSY)).some(visible);
+    const before = new Set(selector && needChange ? document.querySelectorAll(selector) : []);
+    const found = () => !!selector && Array.from(document.querySelectorAll(selector)).some(el => !before.has(el));
+    let timer = null, cap = null, observer = null;
+    const done = (reason) => {
+        if (observer) observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(cap);
+        resolve(reason);
+    };
+    const arm = () => {
+        clearTimeout(timer);
+        timer = setTimeout(() => busy() ? arm() : done('stable'), quiet);
+    };
+    if (found()) return resolve('selector');
+    observer = new MutationObserver(() => found() ? done('selector') : arm());
+    observer.observe(document.documentElement || document,
+                     {childList: true, subtree: true, attributes: true, characterData: true});
+    cap = setTimeout(() => done('timeout'), maxWait);
+    if (!needChange) arm();
+})"""
+
+# Links inside a search-results area (new ones mean the results have rendered)
+SEARCH_RESULTS_SELECTOR = '[class*="result" i] a[href], [id*="result" i] a[href]'
+
+async def wait_for_dom_stable(page: Page, timeout: int = 5000, selector: Optional[str] = None,
+                              require_change: bool = False, quiet_ms: int = None) -> str:
+    """
+    Wait until the page settles: returns 'stable', 'selector' or 'timeout'.
+    timeout (ms) is an upper bound, not a fixed delay. If the document is
+    replaced by a navigation meanwhile, waits on the new document instead.
+    """
+    quiet_ms = quiet_ms or CONFIG.DOM_QUIET_MS
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout / 1000
+    for _ in range(3):
+        remaining = int((deadline - loop.time()) * 1000)
+        if remaining <= 0:
+            return 'timeout'
+        try:
+            return await page.evaluate(DOM_STABLE_JS, [quiet_ms, remaining, selector, require_change])
+        except Exception:
+            # Navigation destroyed the context: the new document is the change
+            require_change = False
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=max(remaining, 1))
+            except Exception:
+                return 'timeout'
+    return 'timeout'
 
-    await page.wait_for_timeout(1500)
+async def wait_for_page_ready(page: Page, timeout: int = 10000):
+    """Wait for page to be fully interactive (DOM quiet, no loading indicator)"""
+    await wait_for_dom_stable(page, timeout=timeout)
 
 async def extract_page_elements(page: Page) -> List[dict]:
     """Extract all interactive elements from the page"""
@@ -496,55 +552,86 @@ async def handle_popups(page: Page, max_attempts: int = 3):
     else:
         log('info', "No popups found", 1)
 
-async def extract_emails_from_page(page: Page, page_text: str) -> List[str]:
-    """Extract emails using multiple methods"""
-    found_emails = set()
-
-    # Method 1: mailto links
-    try:
-        for link in await page.locator("a[href^='mailto:']").all():
-            href = await link.get_attribute("href")
-            if href:
-                email = href.replace("mailto:", "").split("?")[0].split("&")[0].strip()
-                if "@" in email:
-                    found_emails.add(email.lower())
-    except:
-        pass
-
-    # Method 2: Regex on page text
-    for email in EMAIL_PATTERN.findall(page_text):
-        if "@" in email:
-            found_emails.add(email.lower())
-
-    # Method 3: Regex on HTML
-    try:
-        html = await page.content()
-        html = html.replace("&#64;", "@").replace("&#46;", ".").replace("&#x40;", "@")
-        for email in EMAIL_PATTERN.findall(html):
-            if "@" in email:
-                found_emails.add(email.lower())
-    except:
-        pass
-
-    # Method 4: Data attributes
+# Collects everything that can hold an email in one round-trip. Only short,
+# de-duplicated candidate snippets leave the page (mailto links, data-*
+# attributes, Cloudflare-protected and CSS-reversed addresses, and a few
+# words around every @ / &#64; / [at] in the text and HTML); the snippets are
+# decoded in Python. The body text is cut to what the verifier reads.
+HARVEST_EMAILS_JS = r"""({loose, textLimit, maxCandidates}) => {
+    const candidates = new Set();
+    const add = value => {
+        value = (value || '').trim();
+        if (value && candidates.size < maxCandidates) candidates.add(value);
+    };
+
+    document.querySelectorAll("a[href^='mailto:' i]").forEach(a => {
+        add((a.getAttribute('href') || '').slice(7).split('?')[0].split('&')[0]);
+    });
+    document.querySelectorAll('[data-email], [data-mail], [data-contact]').forEach(el => {
+        for (const attr of ['data-email', 'data-mail', 'data-contact']) add(el.getAttribute(attr));
+    });
+    document.querySelectorAll('[data-cfemail]').forEach(el => {
+        add(`data-cfemail="${el.getAttribute('data-cfemail')}"`);
+    });
+    document.querySelectorAll("[style*='rtl' i], [style*='bidi-override' i]").forEach(el => {
+        add(Array.from(el.textContent || '').reverse().join(''));
+    });
+
+    const MARKER = /@|&#0*64;|&#x0*40;|&commat;|email-protection#/i;
+    const OPEN = /[\[\(\{<]$/, CLOSE = /^[\]\)\}>]/;
+    const isMarker = (tokens, i) => {
+        const token = tokens[i];
+        if (MARKER.test(token) || /[\[\(\{<]at[\]\)\}>]/i.test(token)) return true;
+        if (token.toLowerCase() !== 'at') return false;
+        const bracketed = (i > 0 && OPEN.test(tokens[i - 1])) ||
+                          (i + 1 < tokens.length && CLOSE.test(tokens[i + 1]));
+        return bracketed || (loose && token === 'at');
+    };
+    const scan = (source, separator) => {
+        // overlapping windows are merged (up to ~64 tokens), so each stretch is shipped once
+        const tokens = source.split(separator);
+        let start = -1, end = -1;
+        for (let i = 0; i < tokens.length && candidates.size < maxCandidates; i++) {
+            if (!isMarker(tokens, i)) continue;
+            if (start < 0 || i - 4 > end || i - start > 64) {
+                if (start >= 0) add(tokens.slice(start, end).join(' '));
+                start = Math.max(0, i - 4);
+            }
+            end = i + 12;
+        }
+        if (start >= 0) add(tokens.slice(start, end).join(' '));
+    };
+
+    const text = document.body ? document.body.innerText : '';
+    scan(text, /\s+/);
+    if (document.documentElement) scan(document.documentElement.outerHTML, /[\s<>"']+/);
+    return {candidates: Array.from(candidates), text: text.slice(0, textLimit)};
+}"""
+
+async def harvest_page(page: Page, loose: bool = False) -> Tuple[str, List[str]]:
+    """Body text and all emails on the page (lowercased, unique), in one evaluate() call"""
     try:
-        for attr in ["data-email", "data-mail"]:
-            for el in await page.locator(f"[{attr}]").all():
-                email = await el.get_attribute(attr)
-                if email and "@" in email:
-                    found_emails.add(email.lower())
-    except:
-        pass
-
-    # Filter out generic emails
+        result = await page.evaluate(HARVEST_EMAILS_JS, {
+            "loose": loose,
+            "textLimit": CONFIG.VERIFY_TEXT_CHARS,
+            "maxCandidates": CONFIG.HARVEST_MAX_CANDIDATES,
+        })
+    except Exception:
+        return "", []
+    emails = await asyncio.to_thread(find_emails_in, result.get("candidates") or [], loose)
+    return result.get("text") or "", emails
+
+async def extract_emails_from_page(page: Page) -> Tuple[str, List[str]]:
+    """Body text and the page's emails, non-generic ones only if there are any"""
+    text, found_emails = await harvest_page(page)
     valid = [e for e in found_emails if is_valid_email(e)]
-    return valid if valid else list(found_emails)
+    return text, valid if valid else found_emails
 
 # ============== SEARCH RESULT ANALYSIS ==============
 
 def analyze_search_results(html: str, target_name: str, base_url: str) -> List[str]:
     """Analyze search results to find candidate profile links"""
-    soup = BeautifulSoup(html, "lxml")
+    page = parse_html(html)
     domain = urlparse(base_url).netloc
 
     name_parts = [p.lower() for p in target_name.split()]
@@ -557,16 +644,12 @@ def analyze_search_results(html: str, target_name: str, base_url: str) -> List[s
 
     candidates = []
 
-    for a in soup.find_all("a", href=True):
-        href = a.get("href", "")
-        text = a.get_text(" ", strip=True)
+    for link in page.links(base_url):
+        href, text, full_url = link.href, link.text, link.url
 
-        if not href or href.startswith("#") or href.startswith("javascript:"):
+        if href.startswith("#") or href.startswith("javascript:"):
             continue
 
-        full_url = urljoin(base_url, href)
-        full_url = full_url.split('#')[0]  # Remove fragment
-
         if urlparse(full_url).netloc != domain:
             continue
 
@@ -663,33 +746,34 @@ class UniversalEmailAgent:
         self.start_url = url.rstrip("/")
         self.domain = urlparse(url).netloc
         self.name = name
-        self.browser = None
+        self.context = None
         self.page = None
 
     async def setup_browser(self) -> bool:
         try:
-            pw = await async_playwright().start()
-            self.browser = await pw.chromium.launch(
-                headless=CONFIG.HEADLESS,
-                args=['--disable-blink-features=AutomationControlled', '--no-sandbox']
-            )
-            ctx = await self.browser.new_context(
+            self.context = await browser_pool.acquire_context(
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36',
                 viewport={'width': 1920, 'height': 1080}
             )
-            self.page = await ctx.new_page()
-            await self.page.route("**/*.{png,jpg,jpeg,gif,svg,ico,woff,woff2}", lambda r: r.abort())
+            self.page = await self.new_page()
             return True
         except Exception as e:
             log('fail', f"Browser setup failed: {e}")
+            await self.cleanup()
             return False
 
+    async def new_page(self) -> Page:
+        page = await self.context.new_page()
+        await page.route("**/*.{png,jpg,jpeg,gif,svg,ico,woff,woff2}", lambda r: r.abort())
+        return page
+
     async def cleanup(self):
         try:
-            if self.browser:
-                await self.browser.close()
+            await browser_pool.release_context(self.context)
         except:
             pass
+        self.context = None
+        self.page = None
 
     def construct_profile_urls(self) -> List[str]:
         """Construct likely profile URLs when search fails"""
@@ -796,25 +880,9 @@ class UniversalEmailAgent:
 
             log('wait', "Waiting for results...", 1)
 
-            # Wait for AJAX/navigation
-            await asyncio.sleep(2)
-
-            try:
-                await self.page.wait_for_load_state("networkidle", timeout=10000)
-            except:
-                pass
-
-            # Additional wait for JS frameworks to update DOM
-            await self.page.wait_for_timeout(2500)
-
-            # Wait for any loading indicators to disappear
-            try:
-                await self.page.wait_for_function(
-                    "() => !document.querySelector('.loading, .spinner, [class*=\"loading\"], [class*=\"searching\"]')",
-                    timeout=5000
-                )
-            except:
-                pass
+            # Wait for AJAX/navigation to change the page, then for the DOM to settle
+            await wait_for_dom_stable(self.page, timeout=14500, selector=SEARCH_RESULTS_SELECTOR,
+                                      require_change=True)
 
             for sel in ["button:has-text('Apply')", "button:has-text('Search')",
                        "button:has-text('Filter')", "button[type='submit']"]:
@@ -825,7 +893,7 @@ class UniversalEmailAgent:
                         if not any(w in text.lower() for w in ['menu', 'nav', 'clear', 'reset']):
                             log('info', f"Clicking: {text.strip()[:20]}", 1)
                             await btn.click(timeout=3000)
-                            await self.page.wait_for_timeout(2000)
+                            await wait_for_dom_stable(self.page, timeout=2000, require_change=True)
                             break
                 except:
                     pass
@@ -843,31 +911,30 @@ class UniversalEmailAgent:
             log('nav', "Landed directly on profile page")
 
             try:
-                text = await self.page.inner_text("body")
-                emails = await extract_emails_from_page(self.page, text)
+                text, emails = await extract_emails_from_page(self.page)
 
                 if emails:
                     verdict = await ai_verify_profile(text, self.name)
                     if verdict.get("is_match") and verdict.get("confidence", 0) >= CONFIG.MIN_CONFIDENCE:
                         email = verdict.get("email") or emails[0]
-                        if validate_email_mx(email):
+                        if await validate_email_mx(email):
                             return {"email": email, "profile_url": url, "confidence": verdict.get("confidence")}
             except:
                 pass
 
         return None
 
-    async def process_candidate(self, url: str) -> Optional[dict]:
+    async def process_candidate(self, url: str, page: Optional[Page] = None) -> Optional[dict]:
+        page = page or self.page
         # Clean URL (remove fragments)
         url = url.split('#')[0]
 
         try:
-            await self.page.goto(url, timeout=CONFIG.PAGE_TIMEOUT)
-            await self.page.wait_for_timeout(2000)
-            await handle_popups(self.page, max_attempts=1)
+            await page.goto(url, timeout=CONFIG.PAGE_TIMEOUT)
+            await wait_for_dom_stable(page, timeout=2000)
+            await handle_popups(page, max_attempts=1)
 
-            text = await self.page.inner_text("body")
-            emails = await extract_emails_from_page(self.page, text)
+            text, emails = await extract_emails_from_page(page)
 
             verdict = await ai_verify_profile(text, self.name)
             log('info', f"Verdict: match={verdict.get('is_match')}, conf={verdict.get('confidence')}", 1)
@@ -890,7 +957,7 @@ class UniversalEmailAgent:
 
                     for sel in email_reveal_selectors:
                         try:
-                            link = self.page.locator(sel).first
+                            link = page.locator(sel).first
                             if await link.count() > 0 and await link.is_visible(timeout=1000):
                                 # Check if it's a mailto link first
                                 href = await link.get_attribute("href")
@@ -901,18 +968,7 @@ class UniversalEmailAgent:
                         except:
                             pass
 
-                    # Method: Look for email pattern in any visible text
-                    if not email:
-                        try:
-                            all_text = await self.page.evaluate("() => document.body.innerText")
-                            found = EMAIL_PATTERN.findall(all_text)
-                            valid = [e for e in found if is_valid_email(e)]
-                            if valid:
-                                email = valid[0]
-                        except:
-                            pass
-
-                if email and validate_email_mx(email):
+                if email and await validate_email_mx(email):
                     return {"email": email, "profile_url": url, "confidence": verdict.get("confidence")}
                 elif not email:
                     log('warn', "Profile matched but no email found", 1)
@@ -921,6 +977,35 @@ class UniversalEmailAgent:
 
         return None
 
+    async def verify_candidates(self, candidates: List[str]) -> Optional[dict]:
+        """
+        Check candidates concurrently in separate tabs. Returns the first
+        confirmed match and cancels the checks still running.
+        """
+        tabs = asyncio.Semaphore(CONFIG.PARALLEL_CANDIDATES)
+
+        async def check(i: int, url: str) -> Optional[dict]:
+            async with tabs:
+                log('check', f"[{i+1}/{len(candidates)}] {url[:60]}...")
+                page = await self.new_page()
+                try:
+                    return await self.process_candidate(url, page)
+                finally:
+                    await page.close()
+
+        tasks = [asyncio.ensure_future(check(i, url))
+                 for i, url in enumerate(candidates) if not should_skip_url(url)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result:
+                    return result
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def get_contact_page_email(self) -> Optional[dict]:
         """Fallback: Get general firm email from contact page when personal email not found"""
         log('info', "Trying contact page fallback...")
@@ -940,7 +1025,7 @@ class UniversalEmailAgent:
         try:
             log('info', f"Loading homepage: {base_url}", 1)
             await self.page.goto(base_url, timeout=CONFIG.PAGE_TIMEOUT, wait_until='domcontentloaded')
-            await self.page.wait_for_timeout(2000)
+            await wait_for_dom_stable(self.page, timeout=2000)
             await handle_popups(self.page, max_attempts=1)
 
             # Extract emails from homepage footer (often has contact info)
@@ -996,7 +1081,7 @@ class UniversalEmailAgent:
                     log('check', f"Checking: {page_url[:50]}...", 1)
                     response = await self.page.goto(page_url, timeout=15000, wait_until='domcontentloaded')
                     if response and response.status == 200:
-                        await self.page.wait_for_timeout(1500)
+                        await wait_for_dom_stable(self.page, timeout=1500)
                         await handle_popups(self.page, max_attempts=1)
                         await self._extract_emails_to_set(all_emails_found)
 
@@ -1012,27 +1097,28 @@ class UniversalEmailAgent:
             if all_emails_found:
                 log('info', f"Total emails found: {len(all_emails_found)}", 1)
 
-                # Priority 1: Preferred prefixes from firm domain
-                preferred_prefixes = ['info@', 'contact@', 'enquiries@', 'enquiry@', 'office@',
-                                     'mail@', 'hello@', 'general@', 'reception@', 'admin@']
-
-                for prefix in preferred_prefixes:
-                    for email in all_emails_found:
-                        if email.startswith(prefix) and main_domain in email:
-                            if validate_email_mx(email):
-                                log('found', f"General contact email: {email}", 1)
-                                return {
-                                    "email": email,
-                                    "profile_url": self.page.url,
-                                    "confidence": 50,
-                                    "is_general_contact": True
-                                }
+                # Priority 1: Preferred prefixes from firm domain (in prefix order)
+                preferred = []
+                for email in all_emails_found:
+                    m = PREFERRED_CONTACT_RE.match(email)
+                    if m and main_domain in email:
+                        preferred.append((PREFERRED_CONTACT_PREFIXES.index(m.group(0)), email))
+
+                for _, email in sorted(preferred):
+                    if await validate_email_mx(email):
+                        log('found', f"General contact email: {email}", 1)
+                        return {
+                            "email": email,
+                            "profile_url": self.page.url,
+                            "confidence": 50,
+                            "is_general_contact": True
+                        }
 
                 # Priority 2: Any email from firm domain
                 for email in all_emails_found:
                     email_domain = email.split("@")[1] if "@" in email else ""
                     if main_domain in email_domain:
-                        if validate_email_mx(email):
+                        if await validate_email_mx(email):
                             log('found', f"General contact email: {email}", 1)
                             return {
                                 "email": email,
@@ -1056,7 +1142,7 @@ class UniversalEmailAgent:
                     if any(p in email_prefix.lower() for p in excluded_prefixes):
                         continue
 
-                    if validate_email_mx(email):
+                    if await validate_email_mx(email):
                         log('found', f"General contact email: {email}", 1)
                         return {
                             "email": email,
@@ -1074,57 +1160,8 @@ class UniversalEmailAgent:
 
     async def _extract_emails_to_set(self, email_set: set):
         """Extract all emails from current page and add to set"""
-        try:
-            # Method 1: mailto links
-            for link in await self.page.locator("a[href^='mailto:']").all():
-                try:
-                    href = await link.get_attribute("href")
-                    if href:
-                        email = href.replace("mailto:", "").split("?")[0].split("&")[0].strip()
-                        if "@" in email and "." in email.split("@")[1]:
-                            email_set.add(email.lower())
-                except:
-                    pass
-
-            # Method 2: Regex on page text
-            try:
-                text = await self.page.inner_text("body")
-                for email in EMAIL_PATTERN.findall(text):
-                    if "@" in email and "." in email.split("@")[1]:
-                        email_set.add(email.lower())
-            except:
-                pass
-
-            # Method 3: Check HTML for obfuscated emails
-            try:
-                html = await self.page.content()
-                # Decode common obfuscations
-                html = html.replace("&#64;", "@").replace("&#46;", ".")
-                html = html.replace("&#x40;", "@").replace("&#x2e;", ".")
-                html = html.replace("[at]", "@").replace("[dot]", ".")
-                html = html.replace(" at ", "@").replace(" dot ", ".")
-
-                for email in EMAIL_PATTERN.findall(html):
-                    if "@" in email and "." in email.split("@")[1]:
-                        email_set.add(email.lower())
-            except:
-                pass
-
-            # Method 4: Look for email in data attributes
-            try:
-                for attr in ["data-email", "data-mail", "data-contact"]:
-                    for el in await self.page.locator(f"[{attr}]").all():
-                        try:
-                            email = await el.get_attribute(attr)
-                            if email and "@" in email:
-                                email_set.add(email.lower())
-                        except:
-                            pass
-            except:
-                pass
-
-        except:
-            pass
+        _, emails = await harvest_page(self.page, loose=True)
+        email_set.update(emails)
 
     def _is_good_contact_email(self, email: str, main_domain: str) -> bool:
         """Check if email is a good contact email"""
@@ -1141,6 +1178,10 @@ class UniversalEmailAgent:
         return any(p in email_prefix for p in good_prefixes)
 
     async def run(self) -> Optional[dict]:
+        # Pooled browsers live on the background loop, so the agent runs there too
+        return await await_in_background(self._run())
+
+    async def _run(self) -> Optional[dict]:
         log('start', "Universal Email Agent v5")
         log('info', f"Target: {self.name}")
         log('info', f"URL: {self.start_url}")
@@ -1151,7 +1192,6 @@ class UniversalEmailAgent:
                 return None
 
             if not await self.load_page():
-                await self.cleanup()
                 return None
 
             await handle_popups(self.page)
@@ -1160,7 +1200,7 @@ class UniversalEmailAgent:
             elements = await extract_page_elements(self.page)
             if not elements:
                 log('warn', "No elements, waiting for JS...")
-                await self.page.wait_for_timeout(5000)
+                await wait_for_dom_stable(self.page, timeout=5000, require_change=True)
                 elements = await extract_page_elements(self.page)
 
             # If still no elements, try scrolling to trigger lazy loading
@@ -1168,9 +1208,9 @@ class UniversalEmailAgent:
                 log('warn', "Still no elements, trying scroll trigger...")
                 try:
                     await self.page.evaluate("window.scrollTo(0, 500)")
-                    await self.page.wait_for_timeout(2000)
+                    await wait_for_dom_stable(self.page, timeout=2000, require_change=True)
                     await self.page.evaluate("window.scrollTo(0, 0)")
-                    await self.page.wait_for_timeout(2000)
+                    await wait_for_dom_stable(self.page, timeout=2000)
                     elements = await extract_page_elements(self.page)
                 except:
                     pass
@@ -1211,7 +1251,6 @@ class UniversalEmailAgent:
                         if result:
                             log('success', f"Email: {result['email']}")
                             log('info', f"Profile: {result['profile_url']}")
-                            await self.cleanup()
                             return result
                     except:
                         continue
@@ -1224,10 +1263,8 @@ class UniversalEmailAgent:
                     log('success', f"Email (General Contact): {contact_result['email']}")
                     log('info', f"Source: {contact_result['profile_url']}")
                     log('warn', "Note: This is the firm's general contact email, not personal email")
-                    await self.cleanup()
                     return contact_result
 
-                await self.cleanup()
                 return None
 
             log('info', f"Found {len(elements)} elements")
@@ -1244,16 +1281,13 @@ class UniversalEmailAgent:
                     log('success', f"Email (General Contact): {contact_result['email']}")
                     log('info', f"Source: {contact_result['profile_url']}")
                     log('warn', "Note: This is the firm's general contact email, not personal email")
-                    await self.cleanup()
                     return contact_result
 
-                await self.cleanup()
                 return None
 
             print()
 
             if not await self.perform_search(input_loc):
-                await self.cleanup()
                 return None
 
             print()
@@ -1262,12 +1296,11 @@ class UniversalEmailAgent:
             if result:
                 log('success', f"Email: {result['email']}")
                 log('info', f"Profile: {result['profile_url']}")
-                await self.cleanup()
                 return result
 
             log('search', "Analyzing results...")
             html = await self.page.content()
-            candidates = analyze_search_results(html, self.name, self.start_url)
+            candidates = await asyncio.to_thread(analyze_search_results, html, self.name, self.start_url)
 
             if not candidates:
                 log('info', "Standard parsing found 0, trying AI...", 1)
@@ -1291,20 +1324,13 @@ class UniversalEmailAgent:
 
             log('info', f"Found {len(candidates)} candidates", 1)
 
-            for i, url in enumerate(candidates):
-                if should_skip_url(url):
-                    continue
-
+            print()
+            result = await self.verify_candidates(candidates)
+            if result:
                 print()
-                log('check', f"[{i+1}/{len(candidates)}] {url[:60]}...")
-
-                result = await self.process_candidate(url)
-                if result:
-                    print()
-                    log('success', f"Email: {result['email']}")
-                    log('info', f"Profile: {result['profile_url']}")
-                    await self.cleanup()
-                    return result
+                log('success', f"Email: {result['email']}")
+                log('info', f"Profile: {result['profile_url']}")
+                return result
 
             log('fail', "No verified email found")
 
@@ -1316,16 +1342,16 @@ class UniversalEmailAgent:
                 log('success', f"Email (General Contact): {contact_result['email']}")
                 log('info', f"Source: {contact_result['profile_url']}")
                 log('warn', "Note: This is the firm's general contact email, not personal email")
-                await self.cleanup()
                 return contact_result
 
-            await self.cleanup()
             return None
 
         except Exception as e:
             log('fail', f"Agent error: {str(e)[:40]}")
-            await self.cleanup()
             return None
+        finally:
+            # Also runs on cancellation, so the pooled context always goes back
+            await self.cleanup()
 
 # ============== ENTRY POINT ==============
 
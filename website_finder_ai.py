@@ -1090,6 +1090,7 @@ AI Firm Website Finder – v5.3 (Debug Ready)
 ✅ Async + multi-threaded
 ✅ Dict-safe DDG search results
 ✅ Domain + location filters
+✅ Candidates ranked from search snippets (clear winners need no page fetch)
 ✅ AI reasoning + justification
 ✅ Optional debug mode to save full logs
 """
@@ -1098,71 +1099,68 @@ import os
 import re
 import json
 import asyncio
-import hashlib
 import logging
 import argparse
+import time
+import itertools
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from ddgs import DDGS
 from dotenv import load_dotenv
 
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except Exception:
-    GROQ_AVAILABLE = False
+from llm_client import llm_client
+from http_fetcher import http_fetcher
+from disk_cache import DiskCache, cache_path, make_key
+from search_service import search_service
+from concurrency import RecordScheduler
+from record_source import iter_rows
+from result_sink import open_sink
+from html_parsing import VisibleTextReader
 
 # --------------------------------------------------------------------
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger(__name__)
 
-CACHE_DIR = "search_cache_v5"
 DEBUG_DIR = "debug_logs"
-os.makedirs(CACHE_DIR, exist_ok=True)
 os.makedirs(DEBUG_DIR, exist_ok=True)
 
-ddgs = DDGS()
 API_KEY = os.getenv("GROQ_API_KEY")
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; AI-FirmFinder/5.3)"}
+FETCH_TIMEOUT = 10                                                   # seconds per page
+FETCH_DEADLINE = float(os.getenv("WEBSITE_FETCH_DEADLINE", "12"))   # seconds per candidate batch
+FETCH_MAX_BYTES = int(os.getenv("WEBSITE_FETCH_MAX_KB", "256")) * 1024  # download budget per page
 
 # --------------------------------------------------------------------
+def fetch_texts(urls: List[str], limit: int = 2000, deadline: float = FETCH_DEADLINE) -> Dict[str, str]:
+    """
+    First `limit` characters of visible text of many pages, fetched
+    concurrently. Each download streams through a VisibleTextReader and
+    stops once it has enough text or FETCH_MAX_BYTES; non-HTML responses are
+    not read. Pages that fail, return an error status or miss the batch
+    deadline are left out.
+    """
+    urls = [u for u in urls if isinstance(u, str) and u.startswith("http")]
+    pages = http_fetcher.get_capped_many_sync(
+        urls, max_bytes=FETCH_MAX_BYTES, reader=lambda: VisibleTextReader(limit),
+        deadline=deadline, timeout=FETCH_TIMEOUT, headers=HEADERS,
+    )
+    texts = {}
+    for u in urls:
+        page = pages.get(u)
+        if page is not None and page.status_code < 400 and page.text:
+            texts[u] = page.text
+    return texts
+
 def fetch_html(url: str, limit: int = 2000) -> str:
-    if not isinstance(url, str) or not url.startswith("http"):
-        return ""
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        if r.status_code < 400:
-            soup = BeautifulSoup(r.text, "html.parser")
-            text = soup.get_text(" ", strip=True)
-            return text[:limit]
-    except Exception:
-        pass
-    return ""
+    return fetch_texts([url], limit, deadline=FETCH_TIMEOUT).get(url, "")
 
 def cached_search(query: str, max_results: int = 15) -> List[str]:
-    key = hashlib.sha256(query.encode("utf-8")).hexdigest()[:16]
-    path = os.path.join(CACHE_DIR, f"{key}.json")
-    if os.path.exists(path):
-        try:
-            data = json.load(open(path, "r", encoding="utf-8"))
-            if isinstance(data, list):
-                return [d["href"] if isinstance(d, dict) and "href" in d else d for d in data]
-        except Exception:
-            pass
-    results = list(ddgs.text(query, max_results=max_results))
-    urls = []
-    for r in results:
-        if isinstance(r, dict) and r.get("href"):
-            urls.append(r["href"])
-        elif isinstance(r, str):
-            urls.append(r)
-    json.dump(urls, open(path, "w", encoding="utf-8"), indent=2)
-    return urls
+    return [r["href"] for r in search_results(query, max_results)]
+
+def search_results(query: str, max_results: int = 15) -> List[Dict[str, Any]]:
+    """Full search records (href, title, body), as cached by search_service"""
+    return [r for r in search_service.search_sync(query, max_results) if r.get("href")]
 
 def extract_json(text: str) -> Dict[str, Any]:
     if not text:
@@ -1186,46 +1184,153 @@ def normalize_urls(urls: List[Any]) -> List[str]:
             clean.append(u)
     return list(dict.fromkeys(clean))
 
-def filter_by_domain_and_location(firm: str, address: str, urls: List[str]) -> List[str]:
-    urls = normalize_urls(urls)
-    tokens = [t for t in re.split(r"[^a-z]", firm.lower()) if len(t) > 2]
-    city_tokens = [t for t in re.split(r"[^a-z]", address.lower()) if len(t) > 2]
+# --------------------------------------------------------------------
+# Rank search results from their URL, title and snippet before fetching
+# anything: a clear winner needs no page fetch, otherwise only the top
+# WEBSITE_FETCH_TOP pages are downloaded for the LLM.
+RANK_FETCH_TOP = int(os.getenv("WEBSITE_FETCH_TOP", "3"))
+RANK_PROMPT_TOP = 8     # candidates shown to the LLM (the rest by search snippet only)
+RANK_CLEAR_SCORE = int(os.getenv("WEBSITE_RANK_CLEAR_SCORE", "20"))
+RANK_CLEAR_MARGIN = int(os.getenv("WEBSITE_RANK_CLEAR_MARGIN", "10"))
+CLEAR_WIN_CONFIDENCE = 0.85   # reported only; ranking wins are never cached (see store_website)
+
+DOMAIN_BLACKLIST = [
+    "linkedin", "justia", "bloomberg", "martindale", "findlaw", "law360",
+    "zoominfo", "crunchbase", "usnews", "wikipedia", "glassdoor", "indeed",
+    "mapquest", "neverbounce", "panjiva", "superlawyers", "lawinfo", "drugs.com",
+    "microsoft", "lawyers.com", "directory", "profile", "bizstanding",
+    "media-index", "10times", "facebook", "twitter", "yelp", "chambers.com",
+    "legal500", "avvo", "dnb.com", "opencorporates",
+]
+GENERIC_FIRM_TOKENS = {
+    "llp", "llc", "pllc", "ltd", "inc", "law", "firm", "group", "partners",
+    "partner", "and", "the", "attorneys", "attorney", "lawyers", "company", "offices", "office",
+}
+
+def domain_of(url: str) -> str:
+    return re.sub(r"https?://(www\.)?", "", (url or "").lower()).split("/")[0].split(":")[0]
+
+def site_root(url: str) -> str:
+    m = re.match(r"(https?://[^/?#]+)", url or "")
+    return m.group(1) + "/" if m else url
+
+def simple_score(firm: str, address: str, r: Dict[str, Any]) -> int:
+    """Score a search result as the firm's official site from its URL, title and snippet"""
+    url = (r.get("href") or "").lower()
+    title = (r.get("title") or "").lower()
+    body = (r.get("body") or "").lower()
+    domain = domain_of(url)
+    score = 0
 
-    filtered = []
-    for u in urls:
-        if not isinstance(u, str):
+    tokens = [t for t in re.split(r"[^a-z]", firm.lower()) if len(t) > 2]
+    for t in tokens:
+        weight = 1 if t in GENERIC_FIRM_TOKENS else 2
+        if t in domain:
+            score += 4 * weight
+        elif t in title:
+            score += 2 * weight
+        elif t in body:
+            score += 1
+
+    city_tokens = [t for t in re.split(r"[^a-z]", (address or "").lower()) if len(t) > 3]
+    score += min(3, sum(1 for t in city_tokens if t in body or t in title))
+
+    if len(domain.split(".")) <= 3:
+        score += 4
+    if domain.endswith((".com", ".law", ".legal", ".llp")):
+        score += 4
+    if any(k in domain for k in ("law", "llp", "attorney", "legal")):
+        score += 3
+    if any(k in title for k in ("law", "llp", "attorney", "legal")):
+        score += 2
+
+    if any(b in domain for b in DOMAIN_BLACKLIST):
+        score -= 60
+
+    # prefer short clean paths
+    if url.startswith("https://") and url.count("/") <= 3:
+        score += 3
+
+    # penalize weird TLDs
+    if re.search(r"\.(ru|cn|info|xyz|top|click|site|biz)\b", domain):
+        score -= 15
+
+    return score
+
+def rank_candidates(firm: str, address: str, results: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """(score, result) per domain, best first (each domain keeps its best result)"""
+    best: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    for r in results:
+        domain = domain_of(r.get("href", ""))
+        if not domain:
             continue
-        d = re.sub(r"https?://(www\.)?", "", u.lower()).split("/")[0]
-        if any(t in d for t in tokens) or any(t in u.lower() for t in city_tokens):
-            filtered.append(u)
+        score = simple_score(firm, address, r)
+        if domain not in best or score > best[domain][0]:
+            best[domain] = (score, r)
+    return sorted(best.values(), key=lambda x: x[0], reverse=True)
+
+def clear_winner(ranked: List[Tuple[int, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """Top result if it beats the threshold and the runner-up by a wide margin"""
+    if not ranked:
+        return None
+    top = ranked[0][0]
+    runner_up = ranked[1][0] if len(ranked) > 1 else 0
+    if top >= RANK_CLEAR_SCORE and top - runner_up >= RANK_CLEAR_MARGIN:
+        return ranked[0][1]
+    return None
+
+def select_website(firm: str, address: str, debug: bool = False) -> Dict[str, Any]:
+    """Search, rank, and only if needed fetch the top candidates for the LLM"""
+    results = search_results(f"{firm} {address} official website", 20)
+    if not results:
+        return {"best_url": None, "reason": "no_candidates"}
 
-    if len(filtered) < 10:
-        filtered = urls[:15]
-    return filtered[:15]
+    ranked = rank_candidates(firm, address, results)
+    winner = clear_winner(ranked)
+    if winner:
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0
+        logger.info(f"🏁 Clear winner from search ranking: {winner['href']} (score {ranked[0][0]} vs {runner_up})")
+        return {
+            "best_url": site_root(winner["href"]),
+            "confidence": CLEAR_WIN_CONFIDENCE,
+            "reason": f"search ranking: clear winner (score {ranked[0][0]} vs {runner_up})",
+            "summary": winner.get("title", ""),
+            # a snippet heuristic, not a verified pick: re-resolve next run
+            # (the search itself is cached) instead of pinning it for WEBSITE_CACHE_TTL
+            "cacheable": False,
+        }
+
+    candidates = [r for _, r in ranked[:RANK_PROMPT_TOP]]
+    logger.info(f"Ranked {len(ranked)} candidate sites; fetching top {min(RANK_FETCH_TOP, len(candidates))}.")
+    return ai_select_best_site(firm, address, candidates, debug)
 
 # --------------------------------------------------------------------
 def ai_chat(prompt: str) -> str:
-    if not GROQ_AVAILABLE or not API_KEY:
+    if not API_KEY:
         return ""
     try:
-        client = Groq(api_key=API_KEY)
-        resp = client.chat.completions.create(
+        return llm_client.complete_sync(
+            prompt,
             model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
             temperature=0.1,
             max_tokens=1000,
         )
-        return resp.choices[0].message.content.strip()
     except Exception as e:
         logger.warning(f"⚠️ AI error: {e}")
         return ""
 
 # --------------------------------------------------------------------
-def ai_select_best_site(firm: str, address: str, candidates: List[str], debug: bool=False) -> Dict[str, Any]:
+def ai_select_best_site(firm: str, address: str, candidates: List[Any], debug: bool=False,
+                        fetch_top: int = RANK_FETCH_TOP) -> Dict[str, Any]:
+    # candidates: ranked search records (or plain URLs); only the first
+    # fetch_top pages are downloaded, the others are judged by their snippet
+    search_text = {
+        c["href"]: " - ".join(p for p in (c.get("title"), c.get("body")) if p)
+        for c in candidates if isinstance(c, dict) and c.get("href")
+    }
     candidates = normalize_urls(candidates)
-    snippets = {}
-    for u in candidates:
-        snippets[u] = fetch_html(u)
+    fetched = fetch_texts(candidates[:fetch_top])
+    snippets = {u: fetched.get(u) or search_text.get(u, "") for u in candidates}
     candidates = [u for u in candidates if snippets.get(u)]
 
     if not candidates:
@@ -1242,7 +1347,7 @@ You are a digital investigator identifying the *official website* of a firm.
 Firm: {firm}
 Address: {address}
 
-Below are 15 candidate URLs with their page text:
+Below are {len(candidates)} candidate URLs with their page text (or search snippet):
 {joined}
 
 Your task:
@@ -1262,12 +1367,15 @@ Return STRICT JSON:
     text = ai_chat(prompt)
     data = extract_json(text)
     if not data:
+        # no LLM answer (e.g. an outage): a guess for this run only, never cached
         for u in candidates:
             if re.search(rf"{re.escape(firm.split()[0].lower())}", u.lower()):
-                data = {"best_url": u, "confidence": 0.6, "reason": "token fallback", "summary": ""}
+                data = {"best_url": u, "confidence": 0.6, "reason": "token fallback", "summary": "",
+                        "cacheable": False}
                 break
         else:
-            data = {"best_url": candidates[0], "confidence": 0.5, "reason": "fallback", "summary": ""}
+            data = {"best_url": candidates[0], "confidence": 0.5, "reason": "fallback", "summary": "",
+                    "cacheable": False}
 
     # Save debug info if requested
     if debug:
@@ -1286,77 +1394,138 @@ Return STRICT JSON:
     return data
 
 # --------------------------------------------------------------------
-async def website_selector(firm: str, address: str, debug: bool=False) -> Dict[str, Any]:
-    query = f"{firm} {address} official website"
-    logger.info(f"\n🔍 Searching: {query}")
-    urls = cached_search(query, 20)
-    if not urls:
-        return {"best_url": None, "reason": "no_candidates"}
+# Persistent firm → website cache: repeat firms skip search, fetch and LLM.
+# Entries below WEBSITE_CACHE_MIN_CONFIDENCE are stored but always re-resolved.
+WEBSITE_CACHE_TTL = float(os.getenv("WEBSITE_CACHE_TTL_DAYS", "90")) * 86400
+WEBSITE_CACHE_MIN_CONFIDENCE = float(os.getenv("WEBSITE_CACHE_MIN_CONFIDENCE", "0.6"))
+WEBSITE_FIELDS = ("best_url", "confidence", "reason", "summary")
+
+website_cache = DiskCache(cache_path("website_cache.sqlite3"), ttl=WEBSITE_CACHE_TTL)
 
-    urls = filter_by_domain_and_location(firm, address, urls)
-    logger.info(f"Found {len(urls)} filtered candidates.")
+def normalize_firm(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
 
-    result = ai_select_best_site(firm, address, urls, debug)
-    logger.info(f"✅ AI Selected: {result.get('best_url')}")
+def website_cache_key(firm: str, address: str) -> str:
+    return make_key("website", normalize_firm(firm), normalize_firm(address))
+
+def _as_confidence(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def cached_website(firm: str, address: str) -> Dict[str, Any]:
+    """Cached resolution for firm/address, or {} if missing, expired or low-confidence"""
+    entry = website_cache.get(website_cache_key(firm, address))
+    if not entry or not entry.get("best_url"):
+        return {}
+    if _as_confidence(entry.get("confidence")) < WEBSITE_CACHE_MIN_CONFIDENCE:
+        return {}
+    return {k: entry.get(k) for k in WEBSITE_FIELDS}
+
+def store_website(firm: str, address: str, result: Dict[str, Any]):
+    if not result.get("best_url") or not result.get("cacheable", True):
+        return
+    entry = {k: result.get(k) for k in WEBSITE_FIELDS}
+    entry.update(firm=normalize_firm(firm), address=normalize_firm(address), resolved_at=time.time())
+    website_cache.set(website_cache_key(firm, address), entry)
+
+def invalidate_website(firm: str, address: str = None) -> int:
+    """Drop cached resolutions for a firm (one address, or all of them); returns the count"""
+    if address is not None:
+        key = website_cache_key(firm, address)
+        found = website_cache.get(key) is not None
+        website_cache.delete(key)
+        return int(found)
+    name = normalize_firm(firm)
+    doomed = [key for key, entry in website_cache.items() if entry.get("firm") == name]
+    for key in doomed:
+        website_cache.delete(key)
+    return len(doomed)
+
+# --------------------------------------------------------------------
+async def website_selector(firm: str, address: str, debug: bool=False,
+                           refresh: bool = False) -> Dict[str, Any]:
+    # Search, fetching, the LLM call and the SQLite cache all block, so they
+    # run in worker threads and rows stay concurrent
+    cached = {} if refresh else await asyncio.to_thread(cached_website, firm, address)
+    if cached:
+        logger.info(f"🗄️ Cached website for {firm}: {cached.get('best_url')}")
+        return cached
+
+    logger.info(f"\n🔍 Searching: {firm} {address} official website")
+    result = await asyncio.to_thread(select_website, firm, address, debug)
+    logger.info(f"✅ Selected: {result.get('best_url')}")
     logger.info(f"Reason: {result.get('reason')}\n")
+    await asyncio.to_thread(store_website, firm, address, result)
     return result
 
 # --------------------------------------------------------------------
-async def process_excel(path: str, concurrent_tasks: int = 5, debug: bool=False):
-    df = pd.read_excel(path)
-    out_rows = []
+OUTPUT_COLUMNS = ["Row", "Firm", "Address", "Official Website", "Confidence", "Reason", "AI Summary"]
+
+async def process_excel(path: str, concurrent_tasks: int = 5, debug: bool=False,
+                        out_path: str = "Website_Results_AI_v5.3.xlsx", refresh: bool = False):
+    # Rows are streamed in and each result is written as soon as it is ready
+    # (in completion order; "Row" is the input row number). Use a .csv or
+    # .jsonl out_path to follow progress while the run is going.
+    # The input is opened (first row read) before the sink, so an unsupported
+    # or unreadable file fails without truncating a previous output file.
+    rows = iter_rows(path)
+    first = next(rows, None)
+    rows = itertools.chain([first], rows) if first is not None else iter(())
+    sink = open_sink(out_path, OUTPUT_COLUMNS)
 
     async def handle_row(i, row):
         firm = str(row.get("Representative") or "").strip()
         address = str(row.get("Representative address") or "").strip()
         if not firm:
-            return None
-        res = await website_selector(firm, address, debug)
-        return {
+            return
+        res = await website_selector(firm, address, debug, refresh)
+        sink.write({
+            "Row": i,
             "Firm": firm,
             "Address": address,
             "Official Website": res.get("best_url"),
             "Confidence": res.get("confidence", ""),
             "Reason": res.get("reason", ""),
             "AI Summary": res.get("summary", ""),
-        }
-
-    sem = asyncio.Semaphore(concurrent_tasks)
-    async def bounded_task(i, row):
-        async with sem:
-            return await handle_row(i, row)
-
-    tasks = [bounded_task(i, row) for i, row in df.iterrows()]
-    results = await asyncio.gather(*tasks)
-    out_rows = [r for r in results if r]
+        })
 
-    out_df = pd.DataFrame(out_rows)
-    out_path = "Website_Results_AI_v5.3.xlsx"
-    out_df.to_excel(out_path, index=False)
-    logger.info(f"\n✅ Saved to: {out_path}")
+    try:
+        await RecordScheduler(concurrent_tasks).run(rows, handle_row)
+    finally:
+        sink.close()
+    logger.info(f"\n✅ Saved {sink.count} rows to: {out_path}")
+    logger.info(f"🗄️ Search cache: {search_service.cache.stats()}")
+    logger.info(f"🗄️ Website cache: {website_cache.stats()}")
     if debug:
         logger.info(f"🐞 Debug logs written to: {DEBUG_DIR}/debug_logs.jsonl")
 
 
 
 # --------------------------------------------------------------------
-def find_official_website(firm: str, address: str, debug: bool = False) -> Dict[str, Any]:
+def find_official_website(firm: str, address: str, debug: bool = False,
+                          refresh: bool = False) -> Dict[str, Any]:
     """
     Public API wrapper to allow main.py to call website_finder_ai as a module.
     Handles caching, filtering, and AI scoring synchronously.
+    Confident results are served from the website cache; refresh=True
+    re-resolves (and re-caches) the firm.
     """
-    try:
-        urls = cached_search(f"{firm} {address} official website", 20)
-        if not urls:
-            return {"best_url": None, "reason": "no_candidates"}
+    cached = {} if refresh else cached_website(firm, address)
+    if cached:
+        logger.info(f"🗄️ Cached website for {firm}: {cached.get('best_url')}")
+        return cached
 
-        urls = filter_by_domain_and_location(firm, address, urls)
-        result = ai_select_best_site(firm, address, urls, debug)
+    try:
+        selected = select_website(firm, address, debug)
+        # store the raw result: it carries cacheable=False for unverified picks
+        store_website(firm, address, selected)
         return {
-            "best_url": result.get("best_url"),
-            "confidence": result.get("confidence", 0),
-            "reason": result.get("reason", ""),
-            "summary": result.get("summary", "")
+            "best_url": selected.get("best_url"),
+            "confidence": selected.get("confidence", 0),
+            "reason": selected.get("reason", ""),
+            "summary": selected.get("summary", "")
         }
     except Exception as e:
         logger.error(f"Website finder failed for {firm}: {e}")
@@ -1367,10 +1536,29 @@ def find_official_website(firm: str, address: str, debug: bool = False) -> Dict[
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--debug", action="store_true", help="Enable debug logging (saves all AI reasoning)")
+    parser.add_argument("--output", default="Website_Results_AI_v5.3.xlsx",
+                        help="Output file (.xlsx, .csv or .jsonl)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached websites and resolve every firm again")
+    parser.add_argument("--invalidate", metavar="FIRM",
+                        help="Remove cached websites for FIRM and exit")
+    parser.add_argument("--address", default=None,
+                        help="With --invalidate: only the entry for this address")
+    parser.add_argument("--clear-website-cache", action="store_true",
+                        help="Remove all cached websites and exit")
     args = parser.parse_args()
 
+    if args.clear_website_cache:
+        website_cache.clear()
+        print("🗑️ Website cache cleared.")
+        raise SystemExit(0)
+    if args.invalidate:
+        n = invalidate_website(args.invalidate, args.address)
+        print(f"🗑️ Removed {n} cached website(s) for {args.invalidate}.")
+        raise SystemExit(0)
+
     fp = input("\n📁 Enter Excel file path: ").strip()
     if not os.path.exists(fp):
         print("❌ File not found.")
     else:
-        asyncio.run(process_excel(fp, debug=args.debug))
+        asyncio.run(process_excel(fp, debug=args.debug, out_path=args.output, refresh=args.refresh))